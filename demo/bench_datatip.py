@@ -0,0 +1,68 @@
+"""
+Measure the datatip operations with many datatips.
+
+10k datatips are created on 20 subplots; then the time to find the datatips
+of a line/axes, delete the datatips of a line (e.g., the line is removed), and
+clear the datatips of an axes is measured.
+
+    $ python -m mplpanel.demo.bench_datatip
+"""
+import time
+import wx
+import numpy as np
+import matplotlib
+matplotlib.use('module://mplpanel.mplpanel.graph_backend')
+from ..mplpanel.graph import MPLPanel
+
+
+def measure(name, func, *args):
+    start = time.perf_counter()
+    ret = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f'{name:32s}: {elapsed*1000:10.2f} ms')
+    return ret
+
+
+class BenchFrame(wx.Frame):
+    def __init__(self):
+        super().__init__(None, size=(800, 600))
+        MPLPanel.pool_size = 0
+        MPLPanel.Initialize(self)
+        self.panel = MPLPanel(self)
+        self.Show()
+        wx.CallAfter(self.bench)
+
+    def bench(self, num_axes=20, num_tips=10000):
+        figure = self.panel.figure
+        x = np.linspace(0, 10, 10000)
+        lines = []
+        for i in range(num_axes):
+            ax = figure.add_subplot(num_axes//4, 4, i+1)
+            lines.append(ax.plot(x, np.sin(x + i))[0])
+
+        datacursor = self.panel.toolbar.datacursor
+        per_line = num_tips // num_axes
+        def _create():
+            for line in lines:
+                datacursor.create_annotations(line, np.linspace(0, len(x)-1, per_line, dtype=int))
+        measure(f'create {num_tips} datatips', _create)
+        print(f'{"datatips":32s}: {len(datacursor.annotations):10d}')
+
+        ant = list(datacursor.annotations)[-1]
+        measure('find datatip', lambda: ant in datacursor.annotations)
+        measure('datatips of an axes', datacursor.annotations.in_axes, [lines[0].axes])
+        measure('remove datatips of a line', datacursor.OnRemovingLine, figure, [lines[1]])
+        measure('clear datatips of an axes', datacursor.ProcessCommand,
+                datacursor.ID_CLEAR_DATATIP, [lines[2].axes])
+        print(f'{"datatips":32s}: {len(datacursor.annotations):10d}')
+        self.Close()
+
+
+def main():
+    app = wx.App(redirect=False)
+    BenchFrame()
+    app.MainLoop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark the interactive draw policy of the backend.
+
+A typical plotting script (a few hundreds of pyplot calls) is executed with
+the deferred draw policy on and off; for each call, the backend is asked to
+draw the figure as pyplot does in interactive mode.
+
+    $ python -m mplpanel.demo.bench_draw
+"""
+import time
+import wx
+import numpy as np
+import matplotlib
+matplotlib.use('module://mplpanel.mplpanel.graph_backend')
+import matplotlib.pyplot as plt
+from ..mplpanel import graph_backend
+from ..mplpanel.graph import MPLPanel
+
+
+def plot_script(num_lines=100):
+    # a typical script: plot several channels with some decorations, each
+    # pyplot call requests a draw in interactive mode
+    t = np.linspace(0, 10, 10000)
+    for i in range(num_lines):
+        plt.plot(t, np.sin(t + i/10) + i, label=f'ch{i}')
+        graph_backend.draw_if_interactive()
+        plt.xlabel('time (s)')
+        graph_backend.draw_if_interactive()
+        plt.ylabel('value')
+        graph_backend.draw_if_interactive()
+        plt.grid(True)
+        graph_backend.draw_if_interactive()
+        plt.xlim(0, 10)
+        graph_backend.draw_if_interactive()
+
+
+def run(deferred, num_lines=100):
+    graph_backend.set_deferred_draw(deferred)
+    fig = plt.figure()
+    draws = [0]
+    draw = fig.canvas.draw
+
+    def _draw(*args, **kwargs):
+        draws[0] += 1
+        draw(*args, **kwargs)
+    fig.canvas.draw = _draw
+    start = time.perf_counter()
+    plot_script(num_lines)
+    # the deferred draws are done when the GUI is idle; flush them here to
+    # include the render time
+    graph_backend.flush_draw()
+    elapsed = time.perf_counter() - start
+    plt.close('all')
+    return elapsed, draws[0]
+
+
+class BenchFrame(wx.Frame):
+    def __init__(self):
+        super().__init__(None, size=(800, 600))
+        MPLPanel.Initialize(self)
+        self.Show()
+        wx.CallAfter(self.bench)
+
+    def bench(self):
+        for deferred in (False, True):
+            elapsed, draws = run(deferred)
+            print(f'deferred={deferred!s:<5}: {elapsed:8.3f}s, {draws} render(s)')
+        self.Close()
+
+
+def main():
+    app = wx.App(redirect=False)
+    BenchFrame()
+    app.MainLoop()
+
+
+if __name__ == '__main__':
+    main()
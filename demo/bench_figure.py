@@ -0,0 +1,63 @@
+"""
+Measure the per-figure construction time and memory of MPLPanel.
+
+The interaction objects (datatip, timeline, line editor, pan, dock) are
+created lazily when activated; this script compares the panel construction
+with the cost of building all of them for each figure.
+
+    $ python -m mplpanel.demo.bench_figure
+"""
+import time
+import tracemalloc
+import wx
+import matplotlib
+matplotlib.use('module://mplpanel.mplpanel.graph_backend')
+from ..mplpanel.graph import MPLPanel
+
+
+def measure(func, count):
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed/count, peak/count
+
+
+class BenchFrame(wx.Frame):
+    def __init__(self):
+        super().__init__(None, size=(800, 600))
+        # disable the pool to measure the construction
+        MPLPanel.pool_size = 0
+        MPLPanel.Initialize(self)
+        self.Show()
+        wx.CallAfter(self.bench)
+
+    def bench(self, count=20):
+        panels = []
+        def _create_panel():
+            panels.append(MPLPanel(self))
+
+        def _create_actions():
+            toolbar = panels.pop().toolbar
+            for mode in ['datatip', 'edit', 'pan/zoom', 'timeline']:
+                toolbar.get_action(mode)
+            toolbar.dock
+
+        t, m = measure(_create_panel, count)
+        print(f'panel (lazy actions): {t*1000:8.2f} ms, {m/1024:8.1f} KiB per figure')
+        t, m = measure(_create_actions, count)
+        print(f'saved (all actions) : {t*1000:8.2f} ms, {m/1024:8.1f} KiB per figure')
+        self.Close()
+
+
+def main():
+    app = wx.App(redirect=False)
+    BenchFrame()
+    app.MainLoop()
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,7 @@ from matplotlib.backends.backend_wx import Show
 from matplotlib import is_interactive
 from matplotlib import get_backend
 from matplotlib.backends.backend_wxagg import FigureCanvasWxAgg as FigureCanvas
+from ..mplpanel.graph_backend import request_draw, is_deferred_draw
 
 
 def new_figure_manager(num, *args, **kwargs):
@@ -30,7 +31,10 @@ def draw_if_interactive():
     if is_interactive():
         figManager = Gcf.get_active()
         if figManager is not None:
-            figManager.canvas.draw()
+            if is_deferred_draw():
+                request_draw(figManager.canvas)
+            else:
+                figManager.canvas.draw()
 
 
 class ShowFigure(Show):
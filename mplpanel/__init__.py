@@ -2,6 +2,8 @@ from .version import __version__
 from .graph_common import *
 from .graph_datatip import *
 from .graph_edit import *
+from .graph_readout import *
+from .graph_readout_panel import *
 from .graph_timeline import *
 from .graph_canvas import *
 from .graph_subplot import *
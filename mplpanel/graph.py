@@ -1,3 +1,4 @@
+import pickle
 from packaging.version import Version
 import wx
 import wx.py.dispatcher as dp
@@ -5,7 +6,7 @@ import numpy as np
 import matplotlib
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_wx import FigureManagerWx
-from matplotlib.backend_bases import CloseEvent
+from matplotlib.backend_bases import CloseEvent, _Mode
 from matplotlib._pylab_helpers import Gcf
 import matplotlib.pyplot as plt
 from matplotlib import rcParams
@@ -123,28 +124,112 @@ class Toolbar(GraphToolbar):
         if Version(matplotlib.__version__) >= Version('3.3.0'):
             self.init_toolbar()
         self.figure = figure
-        self.datacursor = DataCursor(self.figure, self)
-        self.lineeditor = LineEditor(self.figure)
-        self.timeline = Timeline(self.figure)
-        self.pan_action = Pan(self.figure)
-        self.dock = GDock(self.figure)
+        self.create_actions()
 
         self.dragging_legend = False
 
-        self.actions = {'datatip': self.datacursor,
-                        'edit': self.lineeditor,
-                        'pan/zoom': self.pan_action,
-                        'timeline': self.timeline}
-
-        self.canvas.mpl_connect('pick_event', self.OnPick)
-        self.canvas.mpl_connect('motion_notify_event', self.OnMove)
-        self.canvas.mpl_connect('button_press_event', self.OnPressed)
-        self.canvas.mpl_connect('button_release_event', self.OnReleased)
-        self.canvas.mpl_connect('scroll_event', self.OnScroll)
-        self.canvas.mpl_connect('key_press_event', self.OnKeyPressed)
+        self.connect_canvas()
         # clear the view history
         wx.CallAfter(self._nav_stack.clear)
 
+    def create_actions(self):
+        # the actions (e.g., datatip, timeline) are only created when they are
+        # activated for the first time, as most figures never use all of them
+        self.actions = {}
+        self._dock = None
+
+    def get_action(self, mode, create=True):
+        """return the action for mode; create it if needed"""
+        action = self.actions.get(mode, None)
+        if action is None and create:
+            if mode == 'datatip':
+                action = DataCursor(self.figure, self)
+            elif mode == 'edit':
+                action = LineEditor(self.figure)
+            elif mode == 'pan/zoom':
+                action = Pan(self.figure)
+            elif mode == 'timeline':
+                action = Timeline(self.figure)
+            if action is not None:
+                self.actions[mode] = action
+        return action
+
+    @property
+    def datacursor(self):
+        return self.get_action('datatip')
+
+    @property
+    def lineeditor(self):
+        return self.get_action('edit')
+
+    @property
+    def timeline(self):
+        return self.get_action('timeline')
+
+    @property
+    def pan_action(self):
+        return self.get_action('pan/zoom')
+
+    @property
+    def dock(self):
+        if self._dock is None:
+            self._dock = GDock(self.figure)
+        return self._dock
+
+    def connect_canvas(self):
+        # the callbacks are stored in the figure, so need to connect again
+        # when the canvas is attached to a new figure
+        self._canvas_cids = [
+            self.canvas.mpl_connect('pick_event', self.OnPick),
+            self.canvas.mpl_connect('motion_notify_event', self.OnMove),
+            self.canvas.mpl_connect('button_press_event', self.OnPressed),
+            self.canvas.mpl_connect('button_release_event', self.OnReleased),
+            self.canvas.mpl_connect('scroll_event', self.OnScroll),
+            self.canvas.mpl_connect('key_press_event', self.OnKeyPressed)]
+
+    def disconnect_canvas(self):
+        """
+        Disconnect all the callbacks (including the ones from the base class)
+        from the current figure; must be called before the canvas is attached
+        to a new figure, as the ids are only valid for the current figure.
+        """
+        self.set_mode('')
+        actions = list(self.actions.values())
+        if self._dock is not None:
+            actions.append(self._dock)
+        for action in actions:
+            action.disconnect()
+        self.actions = {}
+        self._dock = None
+        for cid in self._canvas_cids:
+            self.canvas.mpl_disconnect(cid)
+        self._canvas_cids = []
+        for cid in (self._id_press, self._id_release, self._id_drag):
+            self.canvas.mpl_disconnect(cid)
+
+    def reset(self, figure):
+        """
+        Attach the toolbar to a new figure, and clear all the states. The
+        callbacks of the old figure shall have been disconnected with
+        disconnect_canvas.
+        """
+        self.figure = figure
+        self.create_actions()
+        self.dragging_legend = False
+        # clear the states of the base class
+        self._nav_stack.clear()
+        self.mode = _Mode.NONE
+        self._pan_info = None
+        self._zoom_info = None
+        self._id_press = self.canvas.mpl_connect(
+            'button_press_event', self._zoom_pan_handler)
+        self._id_release = self.canvas.mpl_connect(
+            'button_release_event', self._zoom_pan_handler)
+        self._id_drag = self.canvas.mpl_connect(
+            'motion_notify_event', self.mouse_move)
+        self.set_history_buttons()
+        self.connect_canvas()
+
     def GetMenu(self, axes):
         action = self.actions.get(self.mode, None)
         if action is None or not hasattr(action, 'GetMenu'):
@@ -235,7 +320,8 @@ class Toolbar(GraphToolbar):
         if action and hasattr(action, 'mouse_released'):
             action.mouse_released(event)
 
-        self.dock.mouse_released(event)
+        if self._dock is not None:
+            self._dock.mouse_released(event)
         if event.button == matplotlib.backend_bases.MouseButton.RIGHT:
             self.OnContextMenu(event)
             return
@@ -512,8 +598,8 @@ class Toolbar(GraphToolbar):
         action = self.actions.get(self.mode, None)
         if action is None or not hasattr(action, 'mouse_move'):
 
-            if not self.mode and not self.dragging_legend:
-                self.dock.mouse_move(event)
+            if not self.mode and not self.dragging_legend and self._dock is not None:
+                self._dock.mouse_move(event)
             return
         if action.mouse_move(event):
             self.canvas.draw()
@@ -709,7 +795,7 @@ class Toolbar(GraphToolbar):
 
         self.mode = mode
 
-        action = self.actions.get(self.mode, None)
+        action = self.get_action(self.mode)
         if action is not None and hasattr(action, 'activated'):
             action.activated()
 
@@ -722,6 +808,8 @@ class Toolbar(GraphToolbar):
         """activated the pan mode"""
         self.set_mode('pan')
         super().pan(*args)
+        # create the pan action for the keyboard navigation
+        self.get_action(self.mode)
 
     def OnBack(self, *args):
         super().back(*args)
@@ -813,6 +901,12 @@ class Toolbar(GraphToolbar):
 class MPLPanel(wx.Panel):
     frame = None
     kwargs = {}
+    # number of the pre-built panels (per class) for new figures
+    pool_size = 2
+    # delay (ms) to build the next panel in pool when the GUI is idle
+    pool_delay = 500
+    _pools = {}
+    _pool_timers = {}
 
     def __init__(self, parent, title=None, num=-1, thisFig=None):
         # set the size to positive value, otherwise the toolbar will assert
@@ -852,9 +946,37 @@ class MPLPanel(wx.Panel):
         self.figmgr = FigureManagerWx(self.canvas, num, self)
         self.Bind(wx.EVT_CLOSE, self._onClose)
 
-        self.canvas.mpl_connect('button_press_event', self._onClick)
+        self._click_cid = self.canvas.mpl_connect('button_press_event',
+                                                  self._onClick)
         self.Bind(wx.EVT_CHAR_HOOK, self.OnKeyDown)
 
+    def Reset(self, title=None, num=-1, thisFig=None):
+        """
+        Attach a new figure to the panel, and clear all the states (e.g.,
+        dispatcher connections, timeline, datatip, nav stack) of the old one.
+        """
+        figure = thisFig
+        if not figure:
+            figure = Figure(None, None)
+        # the callbacks are stored in the figure, disconnect them before the
+        # canvas is attached to the new figure
+        self.toolbar.disconnect_canvas()
+        self.canvas.mpl_disconnect(self._click_cid)
+        self.figure = figure
+        self.canvas.set_figure(figure)
+
+        self.num = num
+        if title is None:
+            title = 'Figure %d' % self.num
+        self.title = title
+        self.isdestory = False
+        self.figure.set_label(title)
+        self.toolbar.reset(self.figure)
+
+        self.figmgr = FigureManagerWx(self.canvas, num, self)
+        self._click_cid = self.canvas.mpl_connect('button_press_event',
+                                                  self._onClick)
+
     def GetToolBar(self):
         """Override wxFrame::GetToolBar as we don't have managed toolbar"""
         return self.toolbar
@@ -873,7 +995,15 @@ class MPLPanel(wx.Panel):
     def _onClose(self, evt):
         self.close_event()
         self.canvas.stop_event_loop()
-        Gcf.destroy(self.num)
+        # disconnect the actions (e.g., unlink the timeline)
+        self.toolbar.disconnect_canvas()
+        self._destroy_manager()
+
+    def _destroy_manager(self):
+        # the panels in pool (num=-1) are never registered to Gcf; only
+        # destroy the figure in Gcf if it is managed by this panel
+        if Gcf.figs.get(self.num, None) is self:
+            Gcf.destroy(self.num)
 
     def destroy(self, *args):
         if self.isdestory is False:
@@ -884,7 +1014,8 @@ class MPLPanel(wx.Panel):
         self.isdestory = True
         self.close_event()
         self.canvas.stop_event_loop()
-        Gcf.destroy(self.num)
+        self.toolbar.disconnect_canvas()
+        self._destroy_manager()
         return super().Destroy()
 
     def show(self):
@@ -906,6 +1037,31 @@ class MPLPanel(wx.Panel):
     def set_window_title(self, title):
         self.SetTitle(title)
 
+    def get_state(self):
+        """return the state of the datatips and timeline, see set_state"""
+        state = {}
+        for mode in ('datatip', 'timeline'):
+            action = self.toolbar.get_action(mode, create=False)
+            if action is not None:
+                state[mode] = action.get_state()
+        return state
+
+    def set_state(self, state):
+        """restore the datatips and timeline from state (see get_state)"""
+        for mode in ('datatip', 'timeline'):
+            if mode in state:
+                self.toolbar.get_action(mode).set_state(state[mode])
+
+    def save_state(self, filename):
+        """save the state of the datatips and timeline to file"""
+        with open(filename, 'wb') as fp:
+            pickle.dump(self.get_state(), fp)
+
+    def load_state(self, filename):
+        """load the state of the datatips and timeline from file"""
+        with open(filename, 'rb') as fp:
+            self.set_state(pickle.load(fp))
+
     @classmethod
     def GetActive(cls):
         """get the active figure"""
@@ -919,12 +1075,70 @@ class MPLPanel(wx.Panel):
 
     @classmethod
     def AddFigure(cls, title=None, num=None, thisFig=None):
-        fig = cls(cls.frame, title=title, num=num, thisFig=thisFig)
+        fig = None
+        pool = cls._pools.get(cls, [])
+        while pool and not fig:
+            # the panel may have been destroyed (e.g., with the frame)
+            fig = pool.pop()
+        if fig:
+            fig.Reset(title=title, num=num, thisFig=thisFig)
+            fig.Show()
+        else:
+            fig = cls(cls.frame, title=title, num=num, thisFig=thisFig)
+        cls.WarmPool()
         return fig
 
+    @classmethod
+    def WarmPool(cls):
+        """build the panels in pool for new figures when the GUI is idle"""
+        if not cls.frame or cls.pool_size <= 0:
+            return
+        timer = cls._pool_timers.get(cls, None)
+        if timer is not None and timer.IsRunning():
+            return
+        cls._pool_timers[cls] = wx.CallLater(cls.pool_delay, cls._FillPool)
+
+    @classmethod
+    def _FillPool(cls):
+        if not cls.frame:
+            return
+        pool = cls._pools.setdefault(cls, [])
+        pool[:] = [p for p in pool if p]
+        if len(pool) >= cls.pool_size:
+            return
+        if wx.GetMouseState().LeftIsDown() or wx.GetApp().HasPendingEvents():
+            # GUI is busy, try it later
+            cls.WarmPool()
+            return
+        # build one panel each time to keep the GUI responsive; the panel
+        # (num=-1) is a placeholder, its manager is not registered to Gcf
+        # until it is reset with the figure number in AddFigure
+        panel = cls(cls.frame)
+        panel.Hide()
+        pool.append(panel)
+        if len(pool) < cls.pool_size:
+            cls.WarmPool()
+
     @classmethod
     def Initialize(cls, frame, **kwargs):
         if cls.frame is not None:
             return
         cls.frame = frame
         cls.kwargs = kwargs
+        frame.Bind(wx.EVT_CLOSE, cls._OnFrameClose)
+        cls.WarmPool()
+
+    @classmethod
+    def _OnFrameClose(cls, evt):
+        cls.ClearPool()
+        evt.Skip()
+
+    @classmethod
+    def ClearPool(cls):
+        """destroy the panels in pool"""
+        timer = cls._pool_timers.pop(cls, None)
+        if timer is not None:
+            timer.Stop()
+        for panel in cls._pools.pop(cls, []):
+            if panel:
+                panel.Destroy()
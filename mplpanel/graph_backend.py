@@ -1,3 +1,4 @@
+import wx
 from matplotlib.figure import Figure
 from matplotlib._pylab_helpers import Gcf
 from matplotlib.backends.backend_wx import Show
@@ -5,6 +6,13 @@ from matplotlib import is_interactive
 from matplotlib import get_backend
 from matplotlib.backends.backend_wxagg import FigureCanvasWxAgg as FigureCanvas
 
+# draw policy in interactive mode; if deferred, the draw requests from pyplot
+# are merged, and each figure is only rendered once when the GUI is idle
+# (e.g., after the script in the shell is finished).
+_deferred_draw = True
+# canvases waiting to be drawn
+_pending_draw = []
+
 # example for a backend to use MPLPanel
 def new_figure_manager(num, *args, **kwargs):
     """
@@ -21,6 +29,54 @@ def new_figure_manager(num, *args, **kwargs):
     return MPLPanel.AddFigure('Figure %d' % num, num, thisFig)
 
 
+def set_deferred_draw(deferred=True):
+    """
+    Set the interactive draw policy. If *deferred* is False, the pending draws
+    are flushed and the following draws are done immediately.
+    """
+    global _deferred_draw
+    _deferred_draw = deferred
+    if not deferred:
+        flush_draw()
+
+
+def is_deferred_draw():
+    """return True if the interactive draws are deferred"""
+    return _deferred_draw
+
+
+def request_draw(canvas):
+    """
+    Request to draw the canvas when the GUI is idle. Multiple requests on the
+    same canvas before it is drawn are merged into a single render.
+    """
+    if canvas in _pending_draw:
+        return
+    if not _pending_draw:
+        wx.CallAfter(flush_draw)
+    _pending_draw.append(canvas)
+
+
+def flush_draw(canvas=None):
+    """
+    Draw the pending canvases now. If *canvas* is not None, only draw it (if
+    it is pending); otherwise, draw all the pending canvases.
+    """
+    if canvas is None:
+        canvases = _pending_draw[:]
+        _pending_draw.clear()
+    elif canvas in _pending_draw:
+        canvases = [canvas]
+        _pending_draw.remove(canvas)
+    else:
+        return
+    for c in canvases:
+        if not c:
+            # the canvas has been destroyed
+            continue
+        c.draw()
+
+
 def draw_if_interactive():
     """
     This should be overridden in a windowing environment if drawing
@@ -30,7 +86,10 @@ def draw_if_interactive():
     if is_interactive():
         figManager = Gcf.get_active()
         if figManager is not None:
-            figManager.canvas.draw()
+            if _deferred_draw:
+                request_draw(figManager.canvas)
+            else:
+                figManager.canvas.draw()
 
 
 class ShowFigure(Show):
@@ -19,6 +19,11 @@ class FigureCanvas(FigureCanvasWxAgg):
         is better to take the performance hit and redraw the whole window.
         """
         self._update_device_pixel_ratio()
+        self._resize_figure()
+
+    def _resize_figure(self, force=False):
+        """resize the figure to the canvas; if not force, skip it if the canvas
+        size does not change"""
         sz = self.GetParent().GetSizer()
         if sz:
             si = sz.GetItem(self)
@@ -30,7 +35,7 @@ class FigureCanvas(FigureCanvasWxAgg):
             size = self.GetClientSize()
             # Do not allow size to become smaller than MinSize
             size.IncTo(self.GetMinSize())
-        if getattr(self, "_width", None):
+        if not force and getattr(self, "_width", None):
             if size == (self._width, self._height):
                 # no change in size
                 return
@@ -56,6 +61,19 @@ class FigureCanvas(FigureCanvasWxAgg):
         ResizeEvent("resize_event", self)._process()
         self.draw_idle()
 
+    def set_figure(self, figure):
+        """
+        Attach the canvas to a new figure (e.g., when a pre-built panel is used
+        for a new figure), and resize the figure to the canvas.
+        """
+        figure.set_canvas(self)
+        self.figure = figure
+        # the new figure is at its original dpi, apply the device pixel ratio
+        # of the canvas to it, same as _set_device_pixel_ratio
+        figure._set_dpi(self.device_pixel_ratio * figure._original_dpi,
+                        forward=False)
+        self._resize_figure(force=True)
+
     def _mpl_coords(self, pos=None):
         """
         Convert a wx position, defaulting to the current cursor position, to
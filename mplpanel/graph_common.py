@@ -1,6 +1,7 @@
 import wx
 import wx.py.dispatcher as dp
 import numpy as np
+from .graph_subplot import get_share_groups
 
 def is_aux_line(l):
     label = l.get_label()
@@ -13,6 +14,12 @@ class GraphObject():
         dp.connect(self.OnRemovingLine, 'graph.removing_line')
         dp.connect(self.OnRemovedLine, 'graph.removed_line')
 
+    def disconnect(self):
+        '''disconnect from the dispatcher, e.g., before the object is discarded'''
+        dp.disconnect(self.OnUpdated, 'graph.axes_updated')
+        dp.disconnect(self.OnRemovingLine, 'graph.removing_line')
+        dp.disconnect(self.OnRemovedLine, 'graph.removed_line')
+
     def OnRemovingLine(self, figure, lines):
         if self.figure != figure:
             return False
@@ -29,41 +36,29 @@ class GraphObject():
             return False
         return True
 
-    def notify_update(self, axes):
-        # notify others that the data of axes has changed
-        dp.send('graph.axes_updated', figure=self.figure, axes=axes)
+    def notify_update(self, axes, **kwargs):
+        # notify others that the data of axes has changed; optionally, only the
+        # samples [start, stop) of line have been changed (line=, start=,
+        # stop=, and xdata_changed= if its x data is also changed)
+        dp.send('graph.axes_updated', figure=self.figure, axes=axes, **kwargs)
 
     def get_sharex(self, ax):
-        sharex = ax
-        while sharex and sharex._sharex:
-            sharex = sharex._sharex
-        return sharex
+        return get_share_groups(self.figure).get_root(ax, 'x')
 
     def get_sharey(self, ax):
-        sharey = ax
-        while sharey and sharey._sharey:
-            sharey = sharey._sharey
-        return sharey
+        return get_share_groups(self.figure).get_root(ax, 'y')
 
     def get_axes(self, axes, sharex=False, sharey=False, all_axes=False):
         if all_axes:
             axes_out = self.figure.axes
         else:
             axes_out = set(axes)
-            if sharex:
-                sharexes = set()
-                for ax in axes:
-                    sharexes.add(self.get_sharex(ax))
-                for ax in self.figure.axes:
-                    if self.get_sharex(ax) in sharexes:
-                        axes_out.add(ax)
-            if sharey:
-                shareyes = set()
-                for ax in axes:
-                    shareyes.add(self.get_sharey(ax))
-                for ax in self.figure.axes:
-                    if self.get_sharey(ax) in shareyes:
-                        axes_out.add(ax)
+            groups = get_share_groups(self.figure)
+            for ax in axes:
+                if sharex:
+                    axes_out.update(groups.get_group(ax, 'x'))
+                if sharey:
+                    axes_out.update(groups.get_group(ax, 'y'))
         return axes_out
 
     def get_xy_dis_gain(self, ax=None):
@@ -1,15 +1,75 @@
+import bisect
 import datetime
 import math
+import time
+import weakref
 import wx
 import wx.py.dispatcher as dp
 import matplotlib
+from matplotlib.collections import PolyCollection, LineCollection
+from matplotlib.transforms import IdentityTransform
 import numpy as np
 import pandas as pd
 import propgrid as pg
 from propgrid import prop
-from .graph_common import GraphObject
+from .graph_common import GraphObject, is_aux_line
+from .graph_readout import Readout, is_image, get_image_index, find_image
 from .utility import send_data_to_shell, _dict
 
+def format_values(values, fmt):
+    """
+    format the values to strings at once, with fmt['fmt_number'] (e.g., '.2f')
+    for numbers and fmt['fmt_datetime'] for datetimes; None is formatted as ''
+    """
+    values = np.asarray(values)
+    if values.ndim == 0:
+        values = values.reshape(1)
+    if values.dtype.kind == 'O':
+        valid = np.array([v is not None for v in values], dtype=bool)
+        if not valid.all():
+            text = np.full(len(values), '', dtype=object)
+            if valid.any():
+                text[valid] = format_values(list(values[valid]), fmt)
+            return text.tolist()
+        if len(values) and isinstance(values[0], (datetime.date, np.datetime64)):
+            values = pd.to_datetime(values)
+    if values.dtype.kind == 'M' or isinstance(values, pd.DatetimeIndex):
+        text = pd.DatetimeIndex(values).strftime(fmt['fmt_datetime'])
+        return [v if isinstance(v, str) else 'NaT' for v in text]
+    # tolist() converts to python numbers at once, which are much faster to
+    # format than the numpy scalars
+    spec = fmt['fmt_number']
+    return [format(v, spec) for v in values.tolist()]
+
+def _get_artists(ax, kind):
+    if kind == 'image':
+        return [a for a in ax.images + ax.collections if is_image(a)]
+    return [l for l in ax.lines if not is_aux_line(l)]
+
+def get_line_key(line):
+    """
+    return the key of line (or image) to find it in a figure created in the
+    same way: (axes index, kind, position in the axes, label)
+    """
+    ax = line.axes
+    kind = 'image' if is_image(line) else 'line'
+    return (ax.figure.axes.index(ax), kind, _get_artists(ax, kind).index(line),
+            line.get_label())
+
+def find_line(figure, key):
+    """return the line (or image) in figure with key, see get_line_key"""
+    i, kind, n, label = key
+    if i >= len(figure.axes):
+        return None
+    artists = _get_artists(figure.axes[i], kind)
+    if n < len(artists):
+        return artists[n]
+    # some lines have been removed, try the label
+    for a in artists:
+        if a.get_label() == label:
+            return a
+    return None
+
 class TextAnt:
     text_template = 'x: %0.2f\ny: %0.2f'
     def __init__(self, annotation=None, line=None, index=-1):
@@ -17,7 +77,7 @@ class TextAnt:
         self.line = line
         self.index = index
         self.config = _dict(pos_xy=(-1, 1), fmt_number='.2f',
-                            fmt_datatime='%Y-%m-%d %H:%M:%S',
+                            fmt_datetime='%Y-%m-%d %H:%M:%S',
                             clr_edge='#8E8E93',
                             clr_face='#ffffff',
                             clr_alpha=50,
@@ -26,10 +86,40 @@ class TextAnt:
                             clr_alpha_selected=50)
 
         self.is_active = False
+        # callback when the annotation may be moved or resized
+        self.on_changed = None
+        # drawn by DatatipArtist instead of the annotation
+        self.batched = False
+        # the bbox (x0, y0, x1, y1) drawn by DatatipArtist
+        self.extents = None
+        # the axes and text of the annotation to be created, see create_lazy
+        self.ax = None
+        self.text = ""
 
     def __call__(self):
+        if self.annotation is None and self.ax is not None:
+            # create the annotation when it is needed for the first time (e.g.,
+            # activated or not batched)
+            ax, self.ax = self.ax, None
+            self.annotation = self.annotate(ax)
+            self.update_config(position=False, text=self.text)
+            self.annotation.set_visible(not self.batched and self.index != -1)
         return self.annotation
 
+    def is_created(self):
+        """return True if the annotation has been created"""
+        return self.annotation is not None
+
+    def get_axes(self):
+        if self.annotation is None:
+            return self.ax
+        return self.annotation.axes
+
+    def get_text(self):
+        if self.annotation is None:
+            return self.text
+        return self.annotation.get_text()
+
     def set_active(self, active):
         if active == self.is_active:
             return
@@ -44,38 +134,111 @@ class TextAnt:
             # 2) create a datatip
             # 3) call clf() to clear the figure, the datatip will be
             #    cleared, but we will not know
+            if self.annotation is None:
+                self.ax = None
+                return
             self().remove()
         except:
             pass
 
-    def contains(self, mx, my):
+    def get_extents(self):
+        """return the bbox (x0, y0, x1, y1) in display coordinate"""
+        if self.batched:
+            return self.extents
         box = self().get_bbox_patch().get_extents()
-        return box.contains(mx, my)
+        return box.x0, box.y0, box.x1, box.y1
+
+    def contains(self, mx, my):
+        box = self.get_extents()
+        if box is None:
+            return False
+        x0, y0, x1, y1 = box
+        return x0 <= mx <= x1 and y0 <= my <= y1
 
     def get_data(self):
         if self.line is None or self.index == -1:
             return None, None
+        if is_image(self.line):
+            x, y, _ = get_image_index(self.line).sample(self.index)
+            return x, y
         x, y = self.line.get_data(orig=False)
         return x[self.index], y[self.index]
 
     def get_orig_data(self):
         if self.line is None or self.index == -1:
             return None, None
+        if is_image(self.line):
+            return self.get_data()
         x, y = self.line.get_data()
         return x[self.index], y[self.index]
 
+    @staticmethod
+    def get_samples(line, indexes):
+        """
+        return the x, y (in original type) and value (None for Line2D) of the
+        samples of line (Line2D, AxesImage or QuadMesh) at indexes (array or
+        list)
+        """
+        if is_image(line):
+            return get_image_index(line).sample(indexes)
+        x, y = line.get_data()
+        if not isinstance(indexes, np.ndarray):
+            # a few samples (e.g., to update one datatip), index the data
+            # directly instead of converting the whole sequence
+            return [x[i] for i in indexes], [y[i] for i in indexes], None
+        return np.asarray(x)[indexes], np.asarray(y)[indexes], None
+
+    @staticmethod
+    def get_data_x(line, indexes):
+        """return the x (in float) of the samples of line at indexes"""
+        if is_image(line):
+            return get_image_index(line).sample(indexes)[0]
+        return np.asarray(line.get_xdata(orig=False), dtype=float)[indexes]
+
+    @staticmethod
+    def get_num_samples(line):
+        if is_image(line):
+            return len(get_image_index(line))
+        return len(line.get_xdata(orig=False))
+
     def set_index(self, index):
         self.index = index
         self.update()
         self.update_position()
-        self().set_visible(True)
+        if self.is_created():
+            self().set_visible(not self.batched)
+
+    def set_batched(self, batched, renderer=None):
+        """draw the annotation by DatatipArtist or by itself"""
+        if batched == self.batched:
+            return
+        self.batched = batched
+        if batched and not self.is_created():
+            self.changed()
+            return
+        visible = self.index != -1
+        self().set_visible(visible and not batched)
+        if not batched and visible and renderer is not None:
+            self.place(renderer)
+        self.changed()
+
+    def place(self, renderer):
+        """set the position with the bbox size calculated by renderer"""
+        self().update_bbox_position_size(renderer)
+        self.set_position(*self.get_position())
 
     def set_position(self, x, y):
         # x/y is 0/1/-1
-        bbox = self().get_bbox_patch()
-        w, h = bbox.get_width(), bbox.get_height()
-        self().xyann = (x*w - w/2 , y*h-h/2)
+        if self.is_created():
+            bbox = self().get_bbox_patch()
+            w, h = bbox.get_width(), bbox.get_height()
+            self().xyann = (x*w - w/2 , y*h-h/2)
         self.config['pos_xy'] = (x, y)
+        self.changed()
+
+    def changed(self):
+        if self.on_changed is not None:
+            self.on_changed(self)
 
     def update_position(self):
         x, y = self.get_position()
@@ -84,29 +247,43 @@ class TextAnt:
     def get_position(self):
         return self.config['pos_xy']
 
-    def update(self):
-        x, y = self.get_orig_data()
-        self().set_text(self.xy_to_annotation(x, y))
+    def update(self, text=None):
+        if text is None:
+            if self.line is None or self.index == -1:
+                text = ""
+            else:
+                xs, ys, zs = self.get_samples(self.line, [self.index])
+                text = self.xy_to_annotations(xs, ys, self.config, zs)[0]
+        if not self.is_created():
+            self.text = text
+            self.changed()
+            return
+        self().set_text(text)
         self().xy = self.get_data()
+        self.changed()
 
     def xy_to_annotation(self, x, y, fmt=None):
         if x is None or y is None:
             return ""
         if fmt is None:
             fmt = self.config
-        x_str = ""
-        y_str = ""
-        if isinstance(x, datetime.date):
-            x_str = f'x: {x.strftime(fmt["fmt_datetime"])}'
-        else:
-            x_str= f'x: {x:{fmt["fmt_number"]}}'
-        if isinstance(y, datetime.date):
-            y_str = f'y: {y.strftime(fmt["fmt_datetime"])}'
+        return self.xy_to_annotations([x], [y], fmt)[0]
+
+    @staticmethod
+    def xy_to_annotations(xs, ys, fmt, zs=None):
+        """return the text of the annotations at (xs, ys) (and value zs) at once"""
+        xs, ys = format_values(xs, fmt), format_values(ys, fmt)
+        if zs is None:
+            return [f'x: {x}\ny: {y}' for x, y in zip(xs, ys)]
+        zs = np.asarray(zs)
+        if zs.ndim > 1:
+            # RGB(A)
+            zs = [', '.join(format_values(z, fmt)) for z in zs]
         else:
-            y_str= f'y: {y:{fmt["fmt_number"]}}'
-        return '\n'.join([x_str, y_str])
+            zs = format_values(zs, fmt)
+        return [f'x: {x}\ny: {y}\nz: {z}' for x, y, z in zip(xs, ys, zs)]
 
-    def update_config(self, config=None):
+    def update_config(self, config=None, position=True, text=None):
         if config is None:
             config = self.config
         self.config = config
@@ -120,16 +297,33 @@ class TextAnt:
             clr_face = config['clr_face']
             alpha = config['clr_alpha']
 
-        self().get_bbox_patch().set_edgecolor(clr_edge)
-        self().get_bbox_patch().set_facecolor(clr_face)
-        self().get_bbox_patch().set_alpha(alpha/100)
+        if self.is_created():
+            self().get_bbox_patch().set_edgecolor(clr_edge)
+            self().get_bbox_patch().set_facecolor(clr_face)
+            self().get_bbox_patch().set_alpha(alpha/100)
 
-        self.update()
-        self.update_position()
+        self.update(text)
+        if position:
+            self.update_position()
 
     @classmethod
     def create(cls, ax):
         """create the annotation"""
+        return cls(annotation=cls.annotate(ax))
+
+    @classmethod
+    def create_lazy(cls, ax):
+        """
+        create the datatip without the annotation, which is created when it is
+        needed; it is batched (drawn by DatatipArtist) until then
+        """
+        ant = cls()
+        ant.ax = ax
+        ant.batched = True
+        return ant
+
+    @classmethod
+    def annotate(cls, ax):
         ant = ax.annotate(cls.text_template,
                           xy=(0, 0),
                           xytext=(0, 0),
@@ -143,20 +337,348 @@ class TextAnt:
                                       'connectionstyle': 'arc3,rad=0'})
         ant.set_visible(False)
         ant.set_in_layout(False)
-        annotation = cls(annotation=ant)
-        return annotation
+        return ant
+
+class DatatipArtist(matplotlib.artist.Artist):
+    """
+    Draw all the batched datatips of an axes at once: the boxes and the
+    connectors are drawn as one collection each, and the text lines directly
+    with the renderer, without the layout of the annotations. The box of each
+    datatip is saved for hit testing.
+    """
+    label = '_bsm_datatips'
+
+    def __init__(self, registry):
+        super().__init__()
+        self.registry = registry
+        # text -> (width, height, descent)
+        self.metrics = {}
+        # the font/color of the annotations (may not have been created)
+        self.proto = matplotlib.text.Text()
+        self.set_label(self.label)
+        self.set_in_layout(False)
+        # same as the annotations
+        self.set_zorder(matplotlib.text.Text.zorder)
+
+    def get_ants(self):
+        return [ant for ant in self.registry.by_axes.get(self.axes, {}).values()
+                if ant.batched and ant.index != -1 and ant.line is not None]
+
+    def _get_metrics(self, renderer, text, prop):
+        key = (text, hash(prop))
+        m = self.metrics.get(key, None)
+        if m is None:
+            if len(self.metrics) > 10000:
+                self.metrics.clear()
+            m = renderer.get_text_width_height_descent(text, prop, ismath=False)
+            self.metrics[key] = m
+        return m
+
+    def draw(self, renderer):
+        if not self.get_visible():
+            return
+        ants = self.get_ants()
+        for ant in ants:
+            ant.extents = None
+        if not ants:
+            return
+        ax = self.axes
+        xy = ax.transData.transform(np.array([ant.get_data() for ant in ants], dtype=float))
+        # same as the annotation, only show the datatip in the axes
+        bbox = ax.bbox
+        inside = (xy[:, 0] >= bbox.x0) & (xy[:, 0] <= bbox.x1) & \
+                 (xy[:, 1] >= bbox.y0) & (xy[:, 1] <= bbox.y1)
+        ants = [ant for ant, v in zip(ants, inside) if v]
+        xy = xy[inside]
+        if not ants:
+            return
+
+        prop = self.proto.get_fontproperties()
+        # pad of 'round,pad=0.5' and the line spacing, in pixels
+        pad = 0.5 * renderer.points_to_pixels(prop.get_size_in_points())
+        _, lh, ld = self._get_metrics(renderer, 'lp', prop)
+        lh *= 1.2
+        texts = [ant.get_text().split('\n') for ant in ants]
+        tw = np.array([max(self._get_metrics(renderer, s, prop)[0] for s in t) for t in texts])
+        th = np.array([len(t) for t in texts]) * lh
+        pos = np.array([ant.get_position() for ant in ants], dtype=float)
+        # the lower left corner of the text, same as TextAnt.set_position
+        tx = xy[:, 0] + pos[:, 0]*tw - tw/2
+        ty = xy[:, 1] + pos[:, 1]*th - th/2
+        x0, y0, x1, y1 = tx - pad, ty - pad, tx + tw + pad, ty + th + pad
+        for ant, box in zip(ants, zip(x0, y0, x1, y1)):
+            ant.extents = box
+
+        faces, edges = [], []
+        for ant in ants:
+            config = ant.config
+            alpha = config['clr_alpha']/100
+            faces.append(matplotlib.colors.to_rgba(config['clr_face'], alpha))
+            edges.append(matplotlib.colors.to_rgba(config['clr_edge'], alpha))
+        boxes = np.stack([np.column_stack(v) for v in
+                          [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]], axis=1)
+        # connect the data point to the closest point of the box
+        cx, cy = np.clip(xy[:, 0], x0, x1), np.clip(xy[:, 1], y0, y1)
+        segments = np.stack([xy, np.column_stack((cx, cy))], axis=1)
+        for coll in [LineCollection(segments, colors=edges, linewidths=1),
+                     PolyCollection(boxes, facecolors=faces, edgecolors=edges,
+                                    linewidths=1, closed=True)]:
+            coll.set_transform(IdentityTransform())
+            coll.set_figure(self.figure)
+            coll.draw(renderer)
+
+        gc = renderer.new_gc()
+        gc.set_foreground(self.proto.get_color())
+        gc.set_clip_rectangle(self.figure.bbox)
+        _, canvash = renderer.get_canvas_width_height()
+        for lines, x, y in zip(texts, tx, ty + th):
+            for i, s in enumerate(lines):
+                # from the top line, y is the baseline
+                yl = y - (i+1)*lh + ld
+                if renderer.flipy():
+                    yl = canvash - yl
+                renderer.draw_text(gc, x, yl, s, prop, 0)
+        gc.restore()
+        self.stale = False
+
+class DatatipPlacer(matplotlib.artist.Artist):
+    """
+    Place the new annotations of an axes (see TextAnt.place) when the axes is
+    drawn. It is drawn before the annotations, so they can be created without
+    the text layout, and are placed in the same draw.
+    """
+    label = '_bsm_datatip_placer'
+
+    def __init__(self):
+        super().__init__()
+        # the annotations to be placed
+        self.ants = []
+        self.set_label(self.label)
+        self.set_in_layout(False)
+        # before the annotations
+        self.set_zorder(matplotlib.text.Text.zorder - 1)
+
+    def draw(self, renderer):
+        ants, self.ants = self.ants, []
+        for ant in ants:
+            if ant.is_created() and not ant.batched and ant.get_axes() is self.axes:
+                ant.place(renderer)
+        self.stale = False
+
+class AnnotationIndex:
+    """
+    Grid index of the bbox (in display coordinate) of the annotations, so the
+    annotation at a mouse position can be found by only checking the ones in
+    the same grid cell.
+
+    The bbox of an annotation is only updated when it is drawn, so the index
+    shall be updated after the draw: rebuilt if the axes limits/size have
+    been changed, otherwise only the changed annotations are updated.
+    """
+    cell = 64
+
+    def __init__(self, annotations):
+        # annotation -> (order, cells)
+        self.items = {}
+        self.next_order = 0
+        # (col, row) -> [(order, bbox, annotation)] (sorted by order)
+        self.grid = {}
+        self.update(annotations)
+
+    def _remove(self, ant):
+        order, cells = self.items.pop(ant)
+        for key in cells:
+            self.grid[key] = [item for item in self.grid[key] if item[2] is not ant]
+        return order
+
+    def update(self, annotations):
+        """add or update the annotations"""
+        c = self.cell
+        for ant in annotations:
+            if ant in self.items:
+                order = self._remove(ant)
+            else:
+                # new annotation is always the last one
+                order = self.next_order
+                self.next_order += 1
+            try:
+                box = ant.get_extents()
+                fig = ant.get_axes().figure.bbox
+            except AttributeError:
+                # the annotation has been removed
+                continue
+            if box is None or not np.all(np.isfinite(box)):
+                continue
+            x0, y0, x1, y1 = box
+            item = (order, box, ant)
+            # only the part in the figure can be clicked
+            cols = range(int(max(x0, 0)//c), int(min(x1, fig.width)//c) + 1)
+            rows = range(int(max(y0, 0)//c), int(min(y1, fig.height)//c) + 1)
+            cells = [(col, row) for col in cols for row in rows]
+            for key in cells:
+                # the order is unique, so the items are sorted by it
+                bisect.insort(self.grid.setdefault(key, []), item)
+            self.items[ant] = (order, cells)
+
+    def find(self, mx, my):
+        """return the first annotation containing (mx, my)"""
+        c = self.cell
+        for _, (x0, y0, x1, y1), ant in self.grid.get((int(mx//c), int(my//c)), []):
+            if x0 <= mx <= x1 and y0 <= my <= y1:
+                return ant
+        return None
+
+class AnnotationRegistry:
+    """
+    All datatips of a figure, indexed by id (in the order of creation), by
+    line and by axes, so adding/removing a datatip, or finding the ones of a
+    line/axes does not need to scan all datatips.
+    """
+    def __init__(self):
+        # id -> annotation
+        self.ants = {}
+        # id -> axes
+        self.axes = {}
+        # line/axes -> {id: annotation}
+        self.by_line = {}
+        self.by_axes = {}
+        self.next_id = 0
+
+    def __len__(self):
+        return len(self.ants)
+
+    def __iter__(self):
+        return iter(list(self.ants.values()))
+
+    def __contains__(self, ant):
+        return ant is not None and self.ants.get(getattr(ant, 'id', None), None) is ant
+
+    def get(self, id):
+        """return the annotation with id"""
+        return self.ants.get(id, None)
+
+    def add(self, ant):
+        ant.id = self.next_id
+        self.next_id += 1
+        ax = ant.get_axes()
+        self.ants[ant.id] = ant
+        self.axes[ant.id] = ax
+        self.by_line.setdefault(ant.line, {})[ant.id] = ant
+        self.by_axes.setdefault(ax, {})[ant.id] = ant
+
+    @staticmethod
+    def _discard(index, key, id):
+        group = index.get(key, None)
+        if group is None:
+            return
+        group.pop(id, None)
+        if not group:
+            del index[key]
+
+    def remove(self, ant):
+        if ant not in self:
+            return False
+        del self.ants[ant.id]
+        self._discard(self.by_line, ant.line, ant.id)
+        self._discard(self.by_axes, self.axes.pop(ant.id), ant.id)
+        return True
+
+    def set_line(self, ant, line):
+        """move the annotation to line"""
+        if ant not in self:
+            return
+        self._discard(self.by_line, ant.line, ant.id)
+        ant.line = line
+        self.by_line.setdefault(line, {})[ant.id] = ant
+
+    def in_lines(self, lines):
+        """return the annotations of lines"""
+        return [ant for line in set(lines) for ant in self.by_line.get(line, {}).values()]
+
+    def in_axes(self, axes):
+        """return the annotations in axes (in the order of creation)"""
+        ants = [ant for ax in set(axes) for ant in self.by_axes.get(ax, {}).values()]
+        if len(axes) > 1:
+            ants.sort(key=lambda ant: ant.id)
+        return ants
+
+    def has_axes(self, axes):
+        return any(ax in self.by_axes for ax in axes)
+
+class DatatipConfig:
+    """
+    The default datatip config shared by all DataCursors in the process. It is
+    loaded from the frame once; the changes are sent to the registered
+    DataCursors immediately, and saved to the frame later (the changes in
+    between are merged into one save).
+    """
+    group = 'graph_datatip'
+    # delay (in ms) to save the config
+    save_delay = 500
+    config = None
+    cursors = weakref.WeakSet()
+    save_timer = None
+
+    @classmethod
+    def get(cls):
+        """return the config (a copy), load it from the frame if needed"""
+        if cls.config is None:
+            resp = dp.send('frame.get_config', group=cls.group)
+            if not resp:
+                # the frame is not ready, try again next time
+                return {}
+            cls.config = dict(resp[0][1] or {})
+        return dict(cls.config)
+
+    @classmethod
+    def set(cls, config):
+        """update the config, notify the DataCursors and save it later"""
+        cls.get()
+        cls.config = {**(cls.config or {}), **config}
+        for cursor in list(cls.cursors):
+            cursor.OnConfigChanged(dict(cls.config))
+        if cls.save_timer is None:
+            cls.save_timer = wx.CallLater(cls.save_delay, cls.flush)
+
+    @classmethod
+    def flush(cls):
+        """save the config to the frame if it has been changed"""
+        if cls.save_timer is None:
+            return
+        if cls.save_timer.IsRunning():
+            cls.save_timer.Stop()
+        cls.save_timer = None
+        dp.send('frame.set_config', group=cls.group, **cls.config)
+
+    @classmethod
+    def register(cls, cursor):
+        cls.cursors.add(cursor)
+
+    @classmethod
+    def unregister(cls, cursor):
+        cls.cursors.discard(cursor)
 
 class DataCursor(GraphObject):
     MAX_DISTANCE = 5
+    # the key events within the interval (in seconds) are treated as repeat
+    KEY_REPEAT_INTERVAL = 0.3
+    # (repeats, step): the step when the key has been repeated
+    KEY_ACCELERATION = ((0, 1), (10, 10), (30, 100))
 
     ID_DELETE_DATATIP = wx.NewIdRef()
     ID_CLEAR_DATATIP = wx.NewIdRef()
     ID_EXPORT_DATATIP = wx.NewIdRef()
     ID_SETTING = wx.NewIdRef()
+    ID_ADD_PEAK = wx.NewIdRef()
+    ID_ADD_VALLEY = wx.NewIdRef()
+    ID_ADD_CROSSING = wx.NewIdRef()
+    ID_ADD_NTH = wx.NewIdRef()
+    ID_LIGHTWEIGHT = wx.NewIdRef()
+    ID_HOVER = wx.NewIdRef()
 
     def __init__(self, figure, win):
         super().__init__(figure)
-        self.annotations = []
+        self.annotations = AnnotationRegistry()
         self.enable = False
         self.active = None
         self.mx, self.my = None, None
@@ -186,24 +708,107 @@ class DataCursor(GraphObject):
                 prop.PropSpin(0, 100, 'Opacity').Name('clr_alpha_selected').Value(50).Indent(1),
                 ]
         self.LoadConfig()
+        DatatipConfig.register(self)
         self.cx, self.cy = None, None
 
+        # the index to find the annotation at the mouse position
+        self.ant_index = None
+        # the annotations changed since last draw (dict to keep the order)
+        self.ant_changed = {}
+        # the axes limits/size in last draw
+        self.view = None
+        self.draw_cid = figure.canvas.mpl_connect('draw_event', self.OnDraw)
+        # draw the non-active annotations with DatatipArtist
+        self.lightweight = False
+        # show a transient datatip at the point under the mouse
+        self.hover = False
+        # axes -> the hover annotation (animated)
+        self.hover_ants = weakref.WeakKeyDictionary()
+        # axes -> Readout, to search the samples (e.g., hover, events)
+        self.readouts = weakref.WeakKeyDictionary()
+        # the figure without the hover annotation, saved after each draw
+        self.hover_background = None
+        # the latest mouse position, and whether a frame has been requested
+        self.hover_xy = None
+        self.hover_pending = False
+        # the key being held, when it was last pressed and how many times
+        self.key_code, self.key_time, self.key_repeat = None, 0, 0
+        # the index of the active annotation to be set in next frame
+        self.key_index = None
+
+    def disconnect(self):
+        DatatipConfig.unregister(self)
+        # save the pending changes, in case the app is closing
+        DatatipConfig.flush()
+        if self.figure.canvas is not None:
+            self.figure.canvas.mpl_disconnect(self.draw_cid)
+        super().disconnect()
+
+    def OnDraw(self, event):
+        if self.hover:
+            # the hover annotation is animated, so it is not in the background
+            self.hover_background = self.figure.canvas.copy_from_bbox(self.figure.bbox)
+            if self.hover_xy is not None:
+                self.request_hover()
+        # the bbox of the annotations has been updated by the draw
+        view = [(ax.viewLim.bounds, ax.bbox.bounds) for ax in self.figure.axes]
+        if view != self.view:
+            # the axes limits/size have been changed, all annotations may move
+            self.view = view
+            self.ant_index = None
+        elif self.ant_index is not None and self.ant_changed:
+            self.ant_index.update(self.ant_changed)
+        self.ant_changed.clear()
+
+    def OnAntChanged(self, ant):
+        self.ant_changed[ant] = True
+
+    def get_tip_artist(self, ax, create=True, cls=None):
+        """return the DatatipArtist (or DatatipPlacer) of ax"""
+        if cls is None:
+            cls = DatatipArtist
+        for a in ax.artists:
+            if isinstance(a, cls):
+                return a
+        if not create:
+            return None
+        if cls is DatatipArtist:
+            return ax.add_artist(DatatipArtist(self.annotations))
+        return ax.add_artist(cls())
+
+    def set_lightweight(self, enable):
+        """
+        draw the non-active annotations with one DatatipArtist per axes (True),
+        or draw each annotation by itself (False)
+        """
+        self.lightweight = enable
+        renderer = None
+        if not enable:
+            renderer = self.figure.canvas.get_renderer()
+        for ax in self.figure.axes:
+            ants = self.annotations.in_axes([ax])
+            artist = self.get_tip_artist(ax, create=enable and bool(ants))
+            for ant in ants:
+                ant.set_batched(enable and ant != self.active, renderer)
+            if not enable and artist is not None:
+                artist.remove()
+        self.ant_index = None
+        self.figure.canvas.draw_idle()
+
     def FindAntIndex(self, ant):
         if ant not in self.annotations:
             return -1
-        return self.annotations.index(ant)
+        return ant.id
 
     def OnRemovingLine(self, figure, lines):
         if not super().OnRemovingLine(figure, lines):
             return False
-        for idx in range(len(self.annotations)-1, -1, -1):
-            # start from the last annotation, as it may be deleted and change
-            # the list size
-            if self.annotations[idx].line in lines:
-                if self.active == self.annotations[idx]:
-                    self.active = None
-                self.annotations[idx].remove()
-                del self.annotations[idx]
+        for ant in self.annotations.in_lines(lines):
+            if self.active == ant:
+                self.active = None
+            ant.remove()
+            self.annotations.remove(ant)
+            self.ant_index = None
         return True
 
     def pick(self, event):
@@ -234,11 +839,10 @@ class DataCursor(GraphObject):
                 self.set_active(None)
         if self.active is None:
             self.create_annotation(line)
-        idx = self.FindAntIndex(self.active)
-        if idx == -1:
+        if self.active not in self.annotations:
             return False
         # update the annotation line, as it may be moved
-        self.annotations[idx].line = line
+        self.annotations.set_line(self.active, line)
 
         # set the annotation
         inv = line.axes.transData.inverted()
@@ -251,25 +855,44 @@ class DataCursor(GraphObject):
     def keyboard_move(self, left, step=1):
         if not self.active:
             return
-        idx = self.FindAntIndex(self.active)
+        if self.active not in self.annotations:
+            return
+        # continue from the index to be set if the last move has not been
+        # drawn yet
+        idx = self.key_index if self.key_index is not None else self.active.index
         if idx == -1:
             return
-        line = self.annotations[idx].line
-        x, y = line.get_xdata(orig=False), line.get_ydata(orig=False)
-        xc, yc = self.active.get_data()
-        idx = (np.square(x - xc)).argmin()
-        idx_new = idx
-        if left:
-            idx_new -= step
-        else:
-            idx_new += step
-        idx_new = min(len(x)-1, idx_new)
-        idx_new = max(0, idx_new)
+        n = TextAnt.get_num_samples(self.active.line)
+        idx_new = idx - step if left else idx + step
+        idx_new = max(0, min(n-1, idx_new))
         if idx == idx_new:
             return
-        xn, yn = x[idx_new], y[idx_new]
-        if xn is not None:
-            self.active.set_index(idx_new)
+        pending = self.key_index is not None
+        self.key_index = idx_new
+        if not pending:
+            # all the moves before the next frame are merged into one redraw
+            wx.CallAfter(self.set_key_index)
+
+    def set_key_index(self):
+        idx, self.key_index = self.key_index, None
+        if idx is None or self.active not in self.annotations:
+            return
+        self.active.set_index(idx)
+        self.figure.canvas.draw_idle()
+
+    def get_key_step(self, keycode):
+        """return the step for keycode, which is larger when the key is held"""
+        now = time.monotonic()
+        if keycode == self.key_code and now - self.key_time < self.KEY_REPEAT_INTERVAL:
+            self.key_repeat += 1
+        else:
+            self.key_repeat = 0
+        self.key_code, self.key_time = keycode, now
+        step = 1
+        for repeat, s in self.KEY_ACCELERATION:
+            if self.key_repeat >= repeat:
+                step = s
+        return step
 
     def set_enable(self, enable):
         self.enable = enable
@@ -282,6 +905,9 @@ class DataCursor(GraphObject):
 
     def mouse_move(self, event):
         """move the annotation position"""
+        if self.hover and event.button is None:
+            self.hover_move(event)
+            return False
         if event.button != matplotlib.backend_bases.MouseButton.LEFT:
             return False
         # return if no active annotation or the mouse is not pressed
@@ -309,19 +935,146 @@ class DataCursor(GraphObject):
             return True
         return False
 
+    def set_hover(self, enable):
+        """show a transient datatip at the point under the mouse or not"""
+        self.hover = enable
+        self.hover_xy = None
+        for ant in self.hover_ants.values():
+            ant.remove()
+        self.hover_ants.clear()
+        self.hover_background = None
+        # draw to save the background
+        self.figure.canvas.draw_idle()
+
+    def get_readout(self, ax):
+        """return the cached Readout of ax"""
+        readout = self.readouts.get(ax, None)
+        if readout is None:
+            readout = self.readouts[ax] = Readout(ax)
+        return readout
+
+    def get_hover_annotation(self, ax):
+        ant = self.hover_ants.get(ax, None)
+        if ant is None or ant().axes is not ax:
+            ant = TextAnt.create(ax)
+            ant().set_animated(True)
+            ant.update_config(self.get_config(), position=False)
+            self.hover_ants[ax] = ant
+        return ant
+
+    def find_hover(self, mx, my):
+        """return (line, index) of the sample closest to (mx, my)"""
+        if wx.Platform != '__WXMSW__':
+            ratio = self.figure.canvas.device_pixel_ratio
+        else:
+            ratio = 1
+        tolerance = self.MAX_DISTANCE * ratio
+        best = (None, -1, np.inf)
+        for ax in self.figure.axes:
+            if not ax.bbox.contains(mx, my):
+                continue
+            readout = self.get_readout(ax)
+            xdata, ydata = ax.transData.inverted().transform((mx, my))
+            gx, gy = self.get_xy_dis_gain(ax)
+            line, idx, dis = readout.closest(xdata, ydata, gx, gy, tolerance)
+            if dis < best[2]:
+                best = (line, idx, dis)
+        line, idx, dis = best
+        if dis > tolerance:
+            # no line nearby, try the image under the mouse
+            return self.get_image(self.figure.axes, mx, my)
+        return line, idx
+
+    def get_image(self, axes, mx, my):
+        """return the image (AxesImage or QuadMesh) at (mx, my) and the sample index"""
+        for ax in axes:
+            if not ax.bbox.contains(mx, my):
+                continue
+            xdata, ydata = ax.transData.inverted().transform((mx, my))
+            image, idx = find_image(ax, xdata, ydata)
+            if image is not None:
+                return image, idx
+        return None, -1
+
+    def annotation_image(self, image, idx, mx, my):
+        """add annotation to the sample idx of image"""
+        if not self.enable:
+            return False
+        if self.get_annotation(mx, my) is not None:
+            # click in the box of existing annotation, ignore it
+            return False
+        if self.active and self.active().get_visible() and \
+           self.active().axes != image.axes:
+            self.set_active(None)
+        if self.active is None:
+            self.create_annotation(image)
+        if self.active not in self.annotations:
+            return False
+        self.annotations.set_line(self.active, image)
+        self.active.set_index(idx)
+        self.figure.canvas.draw()
+        return True
+
+    def hover_move(self, event):
+        """
+        show the hover annotation at the mouse position; the motion events
+        before the next frame are merged
+        """
+        self.hover_xy = (event.x, event.y)
+        self.request_hover()
+
+    def request_hover(self):
+        if self.hover_pending:
+            return
+        self.hover_pending = True
+        wx.CallAfter(self.draw_hover)
+
+    def draw_hover(self):
+        """draw the hover annotation on the background saved by the last draw"""
+        self.hover_pending = False
+        canvas = self.figure.canvas
+        if not self.hover or self.hover_background is None or canvas is None:
+            return
+        canvas.restore_region(self.hover_background)
+        line, idx = None, -1
+        if self.hover_xy is not None and self.hover_xy[0] is not None:
+            line, idx = self.find_hover(*self.hover_xy)
+        if line is not None:
+            ant = self.get_hover_annotation(line.axes)
+            ant.line, ant.index = line, idx
+            ant.update()
+            ant().set_visible(True)
+            ant.place(canvas.get_renderer())
+            line.axes.draw_artist(ant())
+        canvas.blit()
+
     def get_annotation(self, mx, my):
-        for ant in self.annotations:
-            if ant.contains(mx, my):
-                return ant
-        return None
+        if self.ant_index is None:
+            self.ant_index = AnnotationIndex(self.annotations)
+        return self.ant_index.find(mx, my)
 
-    def OnUpdated(self, figure, axes):
+    def OnUpdated(self, figure, axes, line=None, start=None, stop=None,
+                  xdata_changed=True):
         if not super().OnUpdated(figure, axes):
             return False
-        # axes is updated, try to update all the datatip
-        for ant in self.annotations:
-            if ant.line.axes in axes:
-                ant.update()
+        for ax in axes:
+            readout = self.readouts.get(ax, None)
+            if readout is None:
+                continue
+            if line is None:
+                readout.invalidate()
+            else:
+                readout.data_changed(line, xdata_changed)
+        if line is not None and start is not None:
+            # only the samples [start, stop) of line have been changed
+            ants = [ant for ant in self.annotations.in_lines([line])
+                    if start <= ant.index < stop]
+            if not ants:
+                return True
+        else:
+            # axes is updated, try to update all the datatip
+            ants = self.annotations.in_axes(axes)
+        self.update_annotations(ants)
 
         self.figure.canvas.draw()
         return True
@@ -339,6 +1092,10 @@ class DataCursor(GraphObject):
         if line:
             if self.annotation_line(line, event.x, event.y):
                 return True
+        if line is None or dis > self.MAX_DISTANCE:
+            image, idx = self.get_image(axes, event.x, event.y)
+            if image is not None and self.annotation_image(image, idx, event.x, event.y):
+                return True
 
         # just created the new annotation, do not move to others
         if self.active and (not self.active().get_visible()):
@@ -363,17 +1120,22 @@ class DataCursor(GraphObject):
 
     def set_active(self, ant):
         """set the active annotation"""
-        if ant and self.FindAntIndex(ant) == -1:
+        if ant and ant not in self.annotations:
             return False
 
         if self.active == ant:
             return True
         old_active = self.active
         self.active = ant
+        self.key_index = None
         if old_active:
             old_active.set_active(False)
+            if self.lightweight and old_active in self.annotations:
+                self.get_tip_artist(old_active().axes)
+                old_active.set_batched(True)
         if self.active:
             self.active.set_active(True)
+            self.active.set_batched(False, self.figure.canvas.get_renderer())
         self.figure.canvas.draw_idle()
         return True
 
@@ -386,33 +1148,168 @@ class DataCursor(GraphObject):
         config = self.get_config()
         ant = TextAnt.create(line.axes)
         ant.line = line
-        self.annotations.append(ant)
+        ant.on_changed = self.OnAntChanged
+        self.annotations.add(ant)
         ant.update_config(config)
         self.set_active(ant)
 
+    def find_samples(self, line, kind='peak', threshold=None, step=10):
+        """
+        return the index of the samples in the visible range of line, which
+        are the events (e.g., 'peak', 'valley', 'crossing', see Events) or
+        every step samples ('nth')
+        """
+        x = np.asarray(line.get_xdata(False))
+        xmin, xmax = line.axes.xaxis.get_view_interval()
+        if kind == 'nth':
+            idx = np.flatnonzero((x >= xmin) & (x <= xmax))
+            return idx[::max(int(step), 1)]
+        events = self.get_readout(line.axes).get_events(line, kind, threshold)
+        if events is None:
+            return np.array([], dtype=int)
+        idx = events.samples
+        return idx[(x[idx] >= xmin) & (x[idx] <= xmax)]
+
+    def add_datatips(self, line, kind='peak', threshold=None, step=10):
+        """
+        add datatips to the samples of line found by find_samples, and redraw
+        once; return the new datatips
+        """
+        return self.create_annotations(line, self.find_samples(line, kind, threshold, step))
+
+    def create_annotations(self, line, indexes, config=None, positions=None):
+        """
+        create the annotations at the indexes of line in one pass, with config
+        (the default if it is None) and positions (e.g., [(-1, 1)], see
+        TextAnt.set_position)
+        """
+        if config is None:
+            config = self.get_config()
+        indexes = np.asarray(indexes, dtype=int)
+        xs, ys, zs = TextAnt.get_samples(line, indexes)
+        texts = TextAnt.xy_to_annotations(xs, ys, config, zs)
+        ants = []
+        for idx, text in zip(indexes, texts):
+            if self.lightweight:
+                # drawn by DatatipArtist, the annotation is only created when
+                # it is needed (e.g., activated)
+                ant = TextAnt.create_lazy(line.axes)
+            else:
+                ant = TextAnt.create(line.axes)
+            ant.line = line
+            ant.on_changed = self.OnAntChanged
+            ant.index = int(idx)
+            # the position is set after all annotations are created
+            ant.update_config(dict(config), position=False, text=text)
+            if positions is not None:
+                ant.config['pos_xy'] = tuple(int(v) for v in positions[len(ants)])
+            ant.batched = self.lightweight
+            if ant.is_created():
+                ant().set_visible(not ant.batched)
+            ants.append(ant)
+        if not ants:
+            return ants
+        for ant in ants:
+            self.annotations.add(ant)
+        if self.lightweight:
+            # DatatipArtist will place them when drawing
+            self.get_tip_artist(line.axes)
+        else:
+            # placed right before they are drawn, instead of the text layout
+            # of each annotation here
+            placer = self.get_tip_artist(line.axes, cls=DatatipPlacer)
+            placer.ants.extend(ants)
+        self.figure.canvas.draw_idle()
+        return ants
+
+    @staticmethod
+    def group_by_line(ants):
+        """
+        return [(line, ants, indexes)] of the annotations, the ones with no
+        line/sample are ignored
+        """
+        groups = {}
+        for ant in ants:
+            if ant.line is None or ant.index == -1:
+                continue
+            groups.setdefault(ant.line, []).append(ant)
+        return [(line, g, np.array([ant.index for ant in g], dtype=int))
+                for line, g in groups.items()]
+
+    def update_annotations(self, ants, config=None):
+        """
+        update the text (and config if it is not None) of annotations, the text
+        is formatted at once for all the annotations of a line
+        """
+        for line, group, idx in self.group_by_line(ants):
+            xs, ys, zs = TextAnt.get_samples(line, idx)
+            fmt = config if config is not None else group[0].config
+            texts = TextAnt.xy_to_annotations(xs, ys, fmt, zs)
+            for ant, text in zip(group, texts):
+                if config is None:
+                    ant.update(text)
+                else:
+                    ant.update_config(config, text=text)
+
+    def export_annotations(self, axes):
+        """
+        return the DataFrame of the annotations in axes, with columns x, y,
+        line (label), axes (index in figure) and sample (and z, the value of
+        the images); x/y keep the dtype of the line data
+        """
+        all_axes = self.figure.axes
+        frames = []
+        for line, group, idx in self.group_by_line(self.annotations.in_axes(axes)):
+            xs, ys, zs = TextAnt.get_samples(line, idx)
+            columns = {'x': xs, 'y': ys}
+            if zs is not None:
+                columns['z'] = list(zs) if zs.ndim > 1 else zs
+            frames.append(pd.DataFrame({
+                **columns,
+                'line': line.get_label(),
+                'axes': all_axes.index(line.axes) if line.axes in all_axes else -1,
+                'sample': idx,
+                'id': [ant.id for ant in group]}))
+        if not frames:
+            return pd.DataFrame(columns=['x', 'y', 'line', 'axes', 'sample'])
+        df = pd.concat(frames, ignore_index=True)
+        # in the order of creation
+        df = df.sort_values('id', kind='stable').drop(columns='id')
+        return df.reset_index(drop=True)
+
     def GetMenu(self, axes):
         active_in_axes = False
         if self.active and self.active().get_visible():
-            idx = self.FindAntIndex(self.active)
-            active_in_axes = self.annotations[idx].line.axes in axes
-        ant_in_axes = any(ant.line.axes in axes for ant in self.annotations)
+            active_in_axes = self.active in self.annotations and \
+                             self.active.line.axes in axes
+        ant_in_axes = self.annotations.has_axes(axes)
         cmd = [{'id': self.ID_DELETE_DATATIP, 'label': 'Delete current datatip',
                 'enable': active_in_axes},
                {'id': self.ID_CLEAR_DATATIP, 'label': 'Delete all datatip',
                 'enable': ant_in_axes},
                {'type': wx.ITEM_SEPARATOR},
+               {'type': wx.ITEM_DROPDOWN, 'label': 'Add datatips in view',
+                'items': [{'id': self.ID_ADD_PEAK, 'label': 'Peaks'},
+                          {'id': self.ID_ADD_VALLEY, 'label': 'Valleys'},
+                          {'id': self.ID_ADD_CROSSING, 'label': 'Threshold crossings ...'},
+                          {'id': self.ID_ADD_NTH, 'label': 'Every Nth sample ...'}]},
+               {'type': wx.ITEM_SEPARATOR},
                {'id': self.ID_EXPORT_DATATIP, 'label': 'Export datatip data...',
                 'enable': ant_in_axes},
                {'type': wx.ITEM_SEPARATOR},
+               {'id': self.ID_HOVER, 'label': 'Show datatip on hover',
+                'type': wx.ITEM_CHECK, 'check': self.hover},
+               {'id': self.ID_LIGHTWEIGHT, 'label': 'Lightweight datatips',
+                'type': wx.ITEM_CHECK, 'check': self.lightweight},
                {'id': self.ID_SETTING, 'label': 'Settings ...'},
                ]
         return cmd
 
     def key_down(self, event):
         keycode = event.GetKeyCode()
-        step = 1
+        step = self.get_key_step(keycode)
         if event.ShiftDown():
-            step = 10
+            step *= 10
         if keycode == wx.WXK_LEFT:
             self.keyboard_move(True, step=step)
         elif keycode == wx.WXK_RIGHT:
@@ -422,43 +1319,70 @@ class DataCursor(GraphObject):
 
     def ProcessCommand(self, cmd, axes):
         """process the context menu command"""
-        ant_in_axes = [ant.line.axes in axes for ant in self.annotations]
         active_in_axes = False
-        if self.active:
-            idx = self.FindAntIndex(self.active)
-            active_in_axes = ant_in_axes[idx]
+        if self.active and self.active in self.annotations:
+            active_in_axes = self.active.line.axes in axes
 
         if cmd == self.ID_DELETE_DATATIP:
             if not active_in_axes:
                 return False
-            idx = self.FindAntIndex(self.active)
-            if idx == -1 or not ant_in_axes[idx]:
-                return False
             self.active.remove()
-            del self.annotations[idx]
+            self.annotations.remove(self.active)
+            self.ant_index = None
             self.active = None
             return True
         elif cmd == self.ID_CLEAR_DATATIP:
-            annotations = []
-            for idx, ant in enumerate(self.annotations):
-                if ant_in_axes[idx]:
-                    ant.remove()
-                else:
-                    annotations.append(self.annotations[idx])
-            self.annotations = annotations
+            for ant in self.annotations.in_axes(axes):
+                ant.remove()
+                self.annotations.remove(ant)
+            self.ant_index = None
             self.active = None
             return True
+        elif cmd in [self.ID_ADD_PEAK, self.ID_ADD_VALLEY, self.ID_ADD_CROSSING,
+                     self.ID_ADD_NTH]:
+            threshold, step = None, 10
+            if cmd == self.ID_ADD_PEAK:
+                kind = 'peak'
+            elif cmd == self.ID_ADD_VALLEY:
+                kind = 'valley'
+            else:
+                if cmd == self.ID_ADD_CROSSING:
+                    kind = 'crossing'
+                    msg = 'Threshold for the crossings:'
+                    value = np.mean(axes[0].get_ylim())
+                else:
+                    kind = 'nth'
+                    msg = 'Add a datatip every N samples:'
+                    value = step
+                value = wx.GetTextFromUser(message=msg, caption="bsmedit",
+                                           default_value=f'{value:g}')
+                if not value:
+                    # cancel is clicked
+                    return False
+                try:
+                    value = float(value)
+                except ValueError:
+                    return False
+                if kind == 'crossing':
+                    threshold = value
+                else:
+                    step = value
+            # the line of the active datatip, or all visible lines (e.g., the
+            # active datatip is on an image)
+            lines = [l for l in axes[0].lines if not self.is_aux_line(l) and l.get_visible()]
+            if active_in_axes and not is_image(self.active.line):
+                lines = [self.active.line]
+            for line in lines:
+                self.add_datatips(line, kind, threshold, step)
+            return True
+        elif cmd == self.ID_HOVER:
+            self.set_hover(not self.hover)
+            return True
+        elif cmd == self.ID_LIGHTWEIGHT:
+            self.set_lightweight(not self.lightweight)
+            return True
         elif cmd == self.ID_EXPORT_DATATIP:
-            data = []
-            for idx, ant in enumerate(self.annotations):
-                if ant_in_axes[idx]:
-                    xs, ys = ant.get_orig_data()
-                    data.append((xs, ys))
-            data = np.array(data)
-            df = pd.DataFrame()
-            df['x'] = data[:, 0]
-            df['y'] = data[:, 1]
-            send_data_to_shell('datatip_data', df)
+            send_data_to_shell('datatip_data', self.export_annotations(axes))
             return True
         elif cmd == self.ID_SETTING:
             settings = [s.duplicate() for s in  self.settings]
@@ -488,9 +1412,7 @@ class DataCursor(GraphObject):
                 if apply_all:
                     self.LoadConfig(settings)
                     config = self.get_config(settings)
-                    for idx, ant in enumerate(self.annotations):
-                        if ant_in_axes[idx]:
-                            ant.update_config(config)
+                    self.update_annotations(self.annotations.in_axes(axes), config)
                 elif active:
                     self.set_active(active)
                     active.update_config(self.get_config(settings))
@@ -503,7 +1425,10 @@ class DataCursor(GraphObject):
     def activated(self):
         pass
     def deactivated(self):
-        pass
+        # hide the hover annotation
+        self.hover_xy = None
+        if self.hover:
+            self.request_hover()
 
     def get_config(self, settings=None):
         if settings is None:
@@ -514,20 +1439,114 @@ class DataCursor(GraphObject):
         return config
 
     def SaveConfig(self, settings):
-        config = self.get_config(settings)
-        dp.send('frame.set_config', group='graph_datatip', **config)
+        DatatipConfig.set(self.get_config(settings))
 
     def LoadConfig(self, config=None):
         if config is None:
-            resp = dp.send('frame.get_config', group='graph_datatip')
-            if resp and resp[0][1] is not None:
-                config = resp[0][1]
+            config = DatatipConfig.get()
         if not config:
             return
-        for idx, p in enumerate(self.settings):
+        for p in self.settings:
             n = p.GetName()
-            if n in config:
-                self.settings[idx].SetValue(config[n], True)
+            if n in config and p.GetValue() != config[n]:
+                p.SetValue(config[n], True)
+
+    def OnConfigChanged(self, config):
+        """the default config has been changed (e.g., by other DataCursor)"""
+        self.LoadConfig(config)
+
+    def get_state(self):
+        """
+        return the state of all annotations, to be restored by set_state. The
+        lines are referred by their keys (see get_line_key), and the samples,
+        positions and configs of the annotations are saved in arrays.
+        """
+        lines, configs = [], []
+        line_ids, config_ids = {}, {}
+        line_idx, samples, xs, pos, config_idx = [], [], [], [], []
+        ants = [ant for ant in self.annotations if ant.line is not None and ant.index != -1]
+        for ant in ants:
+            if ant.line not in line_ids:
+                line_ids[ant.line] = len(lines)
+                lines.append((get_line_key(ant.line), TextAnt.get_num_samples(ant.line)))
+            config = {k: v for k, v in ant.config.items() if k != 'pos_xy'}
+            key = repr(sorted(config.items()))
+            if key not in config_ids:
+                config_ids[key] = len(configs)
+                configs.append(config)
+            line_idx.append(line_ids[ant.line])
+            samples.append(ant.index)
+            xs.append(ant.get_data()[0])
+            pos.append(ant.get_position())
+            config_idx.append(config_ids[key])
+        active = ants.index(self.active) if self.active in ants else -1
+        return {'lines': [key for key, _ in lines],
+                'sizes': np.array([n for _, n in lines], dtype=np.int64),
+                'configs': configs,
+                'line': np.array(line_idx, dtype=np.int32),
+                'sample': np.array(samples, dtype=np.int64),
+                # to check whether the data has been changed
+                'x': np.array(xs, dtype=float),
+                'pos': np.array(pos, dtype=np.int8).reshape(-1, 2),
+                'config': np.array(config_idx, dtype=np.int32),
+                'active': active,
+                'lightweight': self.lightweight,
+                'hover': self.hover}
+
+    def set_state(self, state, clear=True):
+        """
+        restore the annotations from state (see get_state), and redraw once.
+        The saved samples are used directly if the data of the line is not
+        changed, otherwise the samples closest to the saved x are used.
+        """
+        if clear:
+            for ant in self.annotations:
+                ant.remove()
+                self.annotations.remove(ant)
+            self.active = None
+            self.ant_index = None
+        if state.get('lightweight', False) != self.lightweight:
+            self.set_lightweight(state.get('lightweight', False))
+        if state.get('hover', False) != self.hover:
+            self.set_hover(state.get('hover', False))
+
+        line_idx, samples = state['line'], np.array(state['sample'], dtype=np.int64)
+        xs, pos, config_idx = state['x'], state['pos'], state['config']
+        restored = np.full(len(samples), None, dtype=object)
+        for i, (key, size) in enumerate(zip(state['lines'], state['sizes'])):
+            line = find_line(self.figure, key)
+            if line is None:
+                continue
+            sel = np.flatnonzero(line_idx == i)
+            idx = samples[sel]
+            n = TextAnt.get_num_samples(line)
+            if n == size and n > 0:
+                changed = not np.array_equal(TextAnt.get_data_x(line, idx), xs[sel],
+                                             equal_nan=True)
+            else:
+                changed = True
+            if changed:
+                if is_image(line):
+                    # the same pixels are kept if the image is only moved;
+                    # if it is resized, the pixels are not at the same
+                    # positions, ignore them
+                    keep = np.full(sel.shape, n == size)
+                else:
+                    idx = self.get_readout(line.axes).index(line, xs[sel])
+                    # -1 if the line is empty
+                    idx = np.broadcast_to(idx, sel.shape)
+                    keep = idx >= 0
+                sel, idx = sel[keep], idx[keep]
+            for c in np.unique(config_idx[sel]):
+                group = config_idx[sel] == c
+                config = {**self.get_config(), **state['configs'][c]}
+                ants = self.create_annotations(line, idx[group], config, pos[sel[group]])
+                restored[sel[group]] = ants
+        active = state.get('active', -1)
+        if 0 <= active < len(restored) and restored[active] is not None:
+            self.set_active(restored[active])
+        self.figure.canvas.draw_idle()
+        return [ant for ant in restored if ant is not None]
 
 
 class DatatipSettingDlg(wx.Dialog):
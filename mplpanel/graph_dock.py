@@ -115,6 +115,11 @@ class GDock(GraphObject):
         self._drag_start_ax = None
         self._drag_start_pos = None
 
+    def disconnect(self):
+        super().disconnect()
+        self.DestroyHintWindow()
+        self.DestroyGuideWindows()
+
     def activated(self):
         pass
 
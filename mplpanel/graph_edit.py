@@ -105,9 +105,8 @@ class LineEditor(GraphObject):
             if self.round_y_to is not None:
                 my = round(my, self.round_y_to)
 
-            x, y = self.active_line.get_data()
-            x = x.copy()
-            y = y.copy()
+            line = self.active_line
+            x, y = line.get_data()
             mode = self.mode
             shift = wx.GetKeyState(wx.WXK_SHIFT)
             if mode == 'x' and shift:
@@ -126,26 +125,91 @@ class LineEditor(GraphObject):
                 #if abs(idx2 - self.index) < abs(idx - self.index):
                 #    idx = idx2
 
+                # the changed samples [start, stop)
+                start = stop = None
                 if self.index > 0 and idx < self.index:
                     # move to left
-                    y[idx:self.index] = y[self.index]
+                    start, stop = idx, self.index
+                    self.set_data(line, start, stop, y=y[self.index])
                     self.index = idx
                 elif self.index > 0 and idx > self.index:
                     # move to right
-                    y[self.index:idx+1] = y[self.index - 1]
+                    start, stop = self.index, idx+1
+                    self.set_data(line, start, stop, y=y[self.index - 1])
                     self.index = idx
                 else:
                     self.index = idx
+                xdata_changed = False
             elif mode == 'y':
-                y[self.index] = my
+                start, stop = self.index, self.index + 1
+                self.set_data(line, start, stop, y=my)
+                xdata_changed = False
             else:
-                x[self.index] = mx
-                y[self.index] = my
-            self.marker[self.active_line.axes].set_data([x[self.index]], [y[self.index]])
-            self.active_line.set_data(x, y)
-            self.notify_update([self.active_line.axes])
+                start, stop = self.index, self.index + 1
+                self.set_data(line, start, stop, x=mx, y=my)
+                xdata_changed = True
+            x, y = line.get_data()
+            self.marker[line.axes].set_data([x[self.index]], [y[self.index]])
+            if start is not None and start < stop:
+                self.notify_update([line.axes], line=line, start=start, stop=stop,
+                                   xdata_changed=xdata_changed)
         self.figure.canvas.draw_idle()
 
+    def set_data(self, line, start, stop, x=None, y=None):
+        """
+        set the x/y (scalar or array) of the samples [start, stop) of line. The
+        data is changed in place if possible, otherwise a copy of the data is
+        set to the line.
+        """
+        if self._set_data_inplace(line, start, stop, x, y):
+            return
+        xd, yd = line.get_data()
+        if x is not None:
+            xd = np.array(xd, copy=True)
+            xd[start:stop] = x
+        if y is not None:
+            yd = np.array(yd, copy=True)
+            yd[start:stop] = y
+        line.set_data(xd, yd)
+
+    @staticmethod
+    def _set_data_inplace(line, start, stop, x=None, y=None):
+        # the cached data and path must be valid, and the path must share the
+        # memory with the cached data (e.g., no steps)
+        if line._invalidx or line._invalidy or line._path is None or \
+           line.get_drawstyle() != 'default' or line._path.vertices is not line._xy:
+            return False
+        n = len(line._xy)
+        for v, orig in ((x, line._xorig), (y, line._yorig)):
+            if v is None:
+                continue
+            # the line keeps its own copy of the data (Line2D.set_data), which
+            # must be float, so no unit conversion is involved
+            if type(orig) is not np.ndarray or orig.dtype.kind != 'f' or \
+               orig.shape != (n,):
+                return False
+        if x is not None and line._subslice:
+            # x must keep sorted, as the visible range is searched on it
+            if line._x_filled is not line._x:
+                return False
+            new = np.broadcast_to(np.asarray(x, dtype=float), (stop - start,))
+            xs = line._x
+            if np.isnan(new).any() or np.any(new[1:] < new[:-1]) or \
+               (start > 0 and xs[start-1] > new[0]) or (stop < n and new[-1] > xs[stop]):
+                return False
+        if x is not None:
+            line._xorig[start:stop] = x
+            line._xy[start:stop, 0] = x
+        if y is not None:
+            line._yorig[start:stop] = y
+            line._xy[start:stop, 1] = y
+        # the path is shared, only the transformed path (e.g., log scale) needs
+        # to be updated
+        if line._transformed_path is not None:
+            line._transformed_path.invalidate()
+        line.stale = True
+        return True
+
     def mouse_released(self, event):
         self.draggable = False
 
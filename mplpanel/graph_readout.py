@@ -0,0 +1,851 @@
+import weakref
+import functools
+import numpy as np
+import pandas as pd
+import matplotlib.dates as mdates
+from matplotlib.image import AxesImage
+from matplotlib.collections import QuadMesh
+from .graph_common import is_aux_line
+
+class SortedIndex:
+    """sorted index of the x data (in float) of a line"""
+    def __init__(self, x):
+        # keep the reference to check whether the data has been changed
+        self.x = x
+        valid = ~np.isnan(x)
+        if valid.all() and (len(x) < 2 or np.all(x[1:] >= x[:-1])):
+            # most lines are already sorted, no need to copy
+            self.order = None
+            self.xs = x
+        else:
+            order = np.argsort(x, kind='stable')
+            # ignore nan
+            self.order = order[valid[order]]
+            self.xs = x[self.order]
+
+    def __len__(self):
+        return len(self.xs)
+
+    def is_same(self, x):
+        # check if x is same as the data used to build the index
+        if x is self.x:
+            return True
+        if len(x) != len(self.x):
+            return False
+        if len(x) == 0:
+            return True
+        n = len(x)
+        for i in (0, n//2, n-1):
+            if x[i] != self.x[i] and not (np.isnan(x[i]) and np.isnan(self.x[i])):
+                return False
+        return np.array_equal(x, self.x, equal_nan=True)
+
+    def to_index(self, pos):
+        # convert the position in sorted data to index in original data
+        if self.order is None:
+            return pos
+        return self.order[pos]
+
+    def nearest(self, xdata):
+        """return the index of the sample closest to xdata"""
+        xs = self.xs
+        if len(xs) == 1:
+            return self.to_index(np.zeros_like(np.searchsorted(xs, xdata)))
+        pos = np.clip(np.searchsorted(xs, xdata), 1, len(xs)-1)
+        # move to the left sample if it is closer
+        pos = pos - (xdata - xs[pos-1] <= xs[pos] - xdata)
+        return self.to_index(pos)
+
+    def previous(self, xdata):
+        """return the index of the last sample not after xdata"""
+        pos = np.searchsorted(self.xs, xdata, side='right') - 1
+        # use the first sample if xdata is before all samples
+        return self.to_index(np.maximum(pos, 0))
+
+    def between(self, x0, x1):
+        """return the index of the samples in [x0, x1]"""
+        lo = np.searchsorted(self.xs, x0)
+        hi = np.searchsorted(self.xs, x1, side='right')
+        return self.to_index(np.arange(lo, hi))
+
+    def bracket(self, xdata):
+        """
+        return the index of the samples on both sides of xdata, and the weight
+        of the right sample for linear interpolation
+        """
+        xs = self.xs
+        if len(xs) == 1:
+            i = self.to_index(np.zeros_like(np.searchsorted(xs, xdata)))
+            return i, i, np.zeros_like(xdata, dtype=float)
+        pos = np.clip(np.searchsorted(xs, xdata, side='right'), 1, len(xs)-1)
+        x0, x1 = xs[pos-1], xs[pos]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            w = np.clip((xdata - x0) / (x1 - x0), 0, 1)
+        # duplicate x
+        w = np.where(x1 > x0, w, 0)
+        return self.to_index(pos-1), self.to_index(pos), w
+
+
+class MergedIndex:
+    """sorted and de-duplicated x data of all lines in an axes"""
+    def __init__(self, indexes):
+        xs = [index.xs for index in indexes]
+        self.indexes = indexes
+        # start of each index in the concatenated data
+        self.offsets = np.cumsum([0] + [len(x) for x in xs])
+        if len(xs) == 1 and (len(xs[0]) < 2 or np.all(xs[0][1:] > xs[0][:-1])):
+            # single index without duplicate x, no need to copy
+            self.x = xs[0]
+            self.first = None
+        elif xs:
+            # position of each x in the concatenated data
+            self.x, self.first = np.unique(np.concatenate(xs), return_index=True)
+        else:
+            self.x = np.array([])
+            self.first = None
+
+    def __len__(self):
+        return len(self.x)
+
+    def source(self, pos):
+        """
+        return the SortedIndex and the index in the original line data of the
+        x at pos
+        """
+        if self.first is not None:
+            pos = self.first[pos]
+        i = np.searchsorted(self.offsets, pos, side='right') - 1
+        index = self.indexes[i]
+        return index, index.to_index(pos - self.offsets[i])
+
+    def nearest(self, xdata):
+        """return the position of the x closest to xdata"""
+        x = self.x
+        if len(x) <= 1:
+            return 0
+        pos = min(max(np.searchsorted(x, xdata), 1), len(x)-1)
+        if xdata - x[pos-1] <= x[pos] - xdata:
+            pos -= 1
+        return pos
+
+    def step(self, xdata, step=1):
+        """
+        return the position of the x which is step (>0 to right, <0 to left)
+        away from xdata; None if it is out of the array
+        """
+        x = self.x
+        if len(x) == 0:
+            return None
+        if step > 0:
+            # the first x on the right side counts as 1st step
+            pos = np.searchsorted(x, xdata, side='right') + step - 1
+        else:
+            pos = np.searchsorted(x, xdata, side='left') + step
+        if pos < 0 or pos >= len(x):
+            # no move if it is out of the array
+            return None
+        return pos
+
+
+class RangeStats:
+    """
+    Statistics (count, mean, min, max, rms, integral) of the samples in any x
+    range of a line.
+
+    The prefix sums (of y, y**2, the trapezoid integral and the valid sample
+    count) answer mean/rms/integral with two lookups. The min/max are served
+    from the sparse tables of the block min/max, plus a scan of the partial
+    blocks at both ends, so each query takes constant time regardless of the
+    size of the range. NaN samples are ignored.
+    """
+    block = 256
+
+    def __init__(self, index, y):
+        self.index = index
+        # keep the reference to check whether the data has been changed
+        self.y = y
+        ys = np.asarray(y, dtype=float)
+        if index.order is not None:
+            ys = ys[index.order]
+        self.ys = ys
+        valid = ~np.isnan(ys)
+        y0 = np.where(valid, ys, 0)
+        self.count = np.concatenate(([0], np.cumsum(valid)))
+        self.sum = np.concatenate(([0.], np.cumsum(y0)))
+        self.sum2 = np.concatenate(([0.], np.cumsum(y0*y0)))
+        # integral of each segment, ignore the segment with nan
+        xs = index.xs
+        seg = np.diff(xs) * (ys[1:] + ys[:-1]) / 2
+        seg[np.isnan(seg)] = 0
+        self.area = np.concatenate(([0.], np.cumsum(seg)))
+
+        n, b = len(ys), self.block
+        padded = np.full(-(-n//b)*b, np.nan)
+        padded[:n] = ys
+        padded = padded.reshape(-1, b)
+        # fmin/fmax ignore nan
+        self.mins = self._sparse_table(np.fmin.reduce(padded, axis=1), np.fmin)
+        self.maxs = self._sparse_table(np.fmax.reduce(padded, axis=1), np.fmax)
+
+    @staticmethod
+    def _sparse_table(values, fun):
+        # table[k][i] is the reduction of values[i:i+2**k]
+        table = [values]
+        k = 1
+        while 2**k <= len(values):
+            prev = table[-1]
+            table.append(fun(prev[:-2**(k-1)], prev[2**(k-1):]))
+            k += 1
+        return table
+
+    def is_same(self, index, y):
+        return index is self.index and y is self.y
+
+    def _reduce(self, table, fun, lo, hi):
+        # reduce ys[lo:hi]
+        b = self.block
+        b0, b1 = -(-lo//b), hi//b
+        if b0 >= b1:
+            # in one or two partial blocks
+            return fun.reduce(self.ys[lo:hi])
+        k = int(np.log2(b1 - b0))
+        v = fun(table[k][b0], table[k][b1-2**k])
+        if lo < b0*b:
+            v = fun(v, fun.reduce(self.ys[lo:b0*b]))
+        if hi > b1*b:
+            v = fun(v, fun.reduce(self.ys[b1*b:hi]))
+        return v
+
+    def get(self, start, end):
+        """return the statistics of the samples with start <= x <= end"""
+        start, end = min(start, end), max(start, end)
+        xs = self.index.xs
+        lo = np.searchsorted(xs, start, side='left')
+        hi = np.searchsorted(xs, end, side='right')
+        count = self.count[hi] - self.count[lo]
+        if count == 0:
+            return {'count': 0, 'mean': np.nan, 'min': np.nan, 'max': np.nan,
+                    'rms': np.nan, 'integral': 0.}
+        return {'count': count,
+                'mean': (self.sum[hi] - self.sum[lo]) / count,
+                'min': self._reduce(self.mins, np.fmin, lo, hi),
+                'max': self._reduce(self.maxs, np.fmax, lo, hi),
+                'rms': np.sqrt(max(self.sum2[hi] - self.sum2[lo], 0) / count),
+                'integral': self.area[max(hi-1, lo)] - self.area[lo]}
+
+
+class Events:
+    """
+    The x (sorted) of the events in a line, so the next/previous event from
+    any position can be found with one searchsorted.
+
+    kind:
+        'crossing': y crosses threshold (either direction)
+        'rising': y goes from below threshold to at or above it
+        'falling': y goes from at or above threshold to below it
+        'edge': y changes its value
+        'nan': the start of a NaN gap
+        'peak'/'valley': local maximum/minimum (the first sample of a plateau)
+    """
+    kinds = ('crossing', 'rising', 'falling', 'edge', 'nan', 'peak', 'valley')
+
+    def __init__(self, index, y, kind, threshold=None):
+        if kind not in self.kinds:
+            raise ValueError(f"unknown event: {kind}")
+        if kind in ('crossing', 'rising', 'falling') and threshold is None:
+            raise ValueError(f"threshold is required for '{kind}' event")
+        self.index = index
+        # keep the reference to check whether the data has been changed
+        self.y = y
+        ys = np.asarray(y)
+        if index.order is not None:
+            ys = ys[index.order]
+        numeric = ys.dtype.kind in 'biuf'
+        if not numeric and kind != 'edge':
+            # only 'edge' works for non-numeric data
+            pos = np.array([], dtype=int)
+        else:
+            # the comparison with nan is always False, so no event crosses
+            # a nan sample
+            a, b = ys[:-1], ys[1:]
+            if kind == 'rising':
+                e = (a < threshold) & (b >= threshold)
+            elif kind == 'falling':
+                e = (a >= threshold) & (b < threshold)
+            elif kind == 'crossing':
+                e = ((a < threshold) & (b >= threshold)) | ((a >= threshold) & (b < threshold))
+            elif kind == 'edge':
+                e = a != b
+                if numeric:
+                    e &= ~np.isnan(a) & ~np.isnan(b)
+            elif kind == 'nan':
+                nan = np.isnan(ys)
+                e = nan[1:] & ~nan[:-1]
+            else:
+                # ignore the flat segments to handle plateau
+                d = np.diff(ys)
+                nan = np.isnan(d)
+                nz = np.flatnonzero(~nan & (d != 0))
+                sign = np.sign(d[nz])
+                if kind == 'peak':
+                    turn = (sign[:-1] > 0) & (sign[1:] < 0)
+                else:
+                    turn = (sign[:-1] < 0) & (sign[1:] > 0)
+                # no nan between the two slopes
+                nanc = np.cumsum(nan)
+                turn &= nanc[nz[1:]] == nanc[nz[:-1]]
+                e = np.zeros(len(a), dtype=bool)
+                e[nz[:-1][turn]] = True
+            # the event is at the sample after the transition
+            pos = np.flatnonzero(e) + 1
+            if kind == 'nan' and len(ys) and np.isnan(ys[0]):
+                pos = np.concatenate(([0], pos))
+        self.x = index.xs[pos]
+        # the index of the events in the line data
+        self.samples = index.to_index(pos)
+
+    def __len__(self):
+        return len(self.x)
+
+    def is_same(self, index, y):
+        return index is self.index and y is self.y
+
+    def find(self, xdata, step=1):
+        """
+        return the x of the event which is step (>0 to right, <0 to left)
+        away from xdata, None if there is no such event
+        """
+        if step > 0:
+            pos = np.searchsorted(self.x, xdata, side='right') + step - 1
+        else:
+            pos = np.searchsorted(self.x, xdata, side='left') + step
+        if step == 0 or pos < 0 or pos >= len(self.x):
+            return None
+        return self.x[pos]
+
+
+class Readout:
+    """
+    Readout the value of all lines in an axes at the timeline position.
+
+    The sorted index of the x data is cached, and shared by the lines with the
+    same x data, so the index of all lines can be resolved with one
+    searchsorted for each x data. The base label (without value) of each line
+    is kept, so the value can be updated without parsing the label.
+
+    The value of a line is its sample closest to the position ('nearest'),
+    its last sample not after the position ('previous'), or interpolated
+    between the samples on both sides ('linear').
+    """
+    modes = ('nearest', 'previous', 'linear')
+
+    def __init__(self, ax, mode='nearest'):
+        self.ax = weakref.ref(ax)
+        # lines (excluding aux lines) in the axes
+        self.lines = []
+        # the x data of each line, to check whether the cache is valid
+        self.xdata = []
+        # the sorted index of each x data, and the lines using it
+        self.indexes = []
+        self.groups = []
+        # line -> its sorted index
+        self.line_index = {}
+        # merged x index of all lines, built when needed
+        self.merged = None
+        # line -> (base label, label with value)
+        self.labels = weakref.WeakKeyDictionary()
+        # line -> RangeStats, built when needed
+        self.stats = weakref.WeakKeyDictionary()
+        # line -> {(kind, threshold): Events}, built when needed
+        self.events = weakref.WeakKeyDictionary()
+        self.mode = None
+        self.set_mode(mode)
+
+    def set_mode(self, mode):
+        if mode not in self.modes:
+            raise ValueError(f"unknown readout mode: {mode}")
+        self.mode = mode
+
+    def get_lines(self):
+        ax = self.ax()
+        if ax is None:
+            return []
+        return [l for l in ax.lines if not is_aux_line(l)]
+
+    def update(self):
+        """rebuild the index if the lines or their data have been changed"""
+        lines = self.get_lines()
+        xdata = [l.get_xdata(False) for l in lines]
+        if len(lines) == len(self.lines) and \
+           all(l is l0 for l, l0 in zip(lines, self.lines)) and \
+           all(x is x0 for x, x0 in zip(xdata, self.xdata)):
+            return
+
+        indexes, groups = [], []
+        # reuse the index if possible
+        existing = self.indexes
+        for i, x in enumerate(xdata):
+            for g, index in enumerate(indexes):
+                if index.is_same(x):
+                    groups[g].append(i)
+                    break
+            else:
+                for index in existing:
+                    if index.x is x:
+                        break
+                else:
+                    index = SortedIndex(x)
+                indexes.append(index)
+                groups.append([i])
+        self.lines = lines
+        self.xdata = xdata
+        self.indexes = indexes
+        self.groups = [np.array(g) for g in groups]
+        self.line_index = {lines[i]: index
+                           for index, group in zip(indexes, groups)
+                           for i in group}
+        self.merged = None
+
+    def invalidate(self):
+        self.lines = []
+        self.xdata = []
+        self.indexes = []
+        self.groups = []
+        self.line_index = {}
+        self.merged = None
+
+    def data_changed(self, line, xdata_changed=True):
+        """the data of line has been changed in place"""
+        self.stats.pop(line, None)
+        self.events.pop(line, None)
+        if xdata_changed:
+            # the sorted index needs to be rebuilt
+            self.invalidate()
+
+    def get_merged(self):
+        """return the merged x index of all lines"""
+        self.update()
+        if self.merged is None:
+            self.merged = MergedIndex(self.indexes)
+        return self.merged
+
+    def get_line(self, index):
+        """return the first line using the SortedIndex"""
+        for idx, group in zip(self.indexes, self.groups):
+            if idx is index:
+                return self.lines[group[0]]
+        return None
+
+    def next_x(self, xdata, step=1):
+        """return the x (in float) which is step away from xdata"""
+        merged = self.get_merged()
+        pos = merged.step(xdata, step)
+        if pos is None:
+            return xdata
+        return merged.x[pos]
+
+    def snap(self, xdata):
+        """
+        return the line and the index of the sample closest to xdata among all
+        lines
+        """
+        merged = self.get_merged()
+        if len(merged) == 0:
+            return None, -1
+        index, idx = merged.source(merged.nearest(xdata))
+        return self.get_line(index), idx
+
+    def lookup(self, xdata):
+        """
+        return the index of the sample closest to xdata for each line (-1 if
+        the line is empty), and the line/index of the sample closest to xdata
+        among all lines.
+        """
+        self.update()
+        idx = np.full(len(self.lines), -1)
+        closest, dis_min = (None, -1), np.inf
+        for index, group in zip(self.indexes, self.groups):
+            if len(index) == 0:
+                continue
+            i = index.nearest(xdata)
+            idx[group] = i
+            dis = abs(index.x[i] - xdata)
+            if dis < dis_min:
+                dis_min = dis
+                closest = (self.lines[group[0]], i)
+        return idx, closest
+
+    def sample(self, xdata):
+        """
+        return the value of each line at each position in xdata (None if the
+        line is empty)
+        """
+        self.update()
+        xdata = np.atleast_1d(np.asarray(xdata, dtype=float))
+        values = [None] * len(self.lines)
+        for index, group in zip(self.indexes, self.groups):
+            if len(index) == 0:
+                continue
+            # resolve the index once for all lines with the same x data
+            if self.mode == 'linear':
+                i0, i1, w = index.bracket(xdata)
+            elif self.mode == 'previous':
+                i0, i1, w = index.previous(xdata), None, None
+            else:
+                i0, i1, w = index.nearest(xdata), None, None
+            for g in group:
+                y = np.asarray(self.lines[g].get_ydata())
+                if i1 is not None and y.dtype.kind in 'biuf':
+                    values[g] = y[i0] * (1 - w) + y[i1] * w
+                elif i1 is not None:
+                    # not able to interpolate, use the previous sample
+                    values[g] = y[np.where(w < 1, i0, i1)]
+                else:
+                    values[g] = y[i0]
+        return values
+
+    def index(self, line, xdata):
+        """return the index of the sample in line closest to xdata"""
+        self.update()
+        index = self.line_index.get(line, None)
+        if index is None or len(index) == 0:
+            return -1
+        return index.nearest(xdata)
+
+    def sample_images(self, xdata, ydata):
+        """
+        return [(image, values)] of the images in the axes, where values are
+        the values at (x, ydata) for each x in xdata (None if x is outside)
+        """
+        ax = self.ax()
+        if ax is None:
+            return []
+        samples = []
+        for image in get_images(ax):
+            index = get_image_index(image)
+            values = []
+            for x in xdata:
+                idx = index.find(x, ydata)
+                values.append(None if idx == -1 else index.sample(idx)[2])
+            samples.append((image, values))
+        return samples
+
+    def closest(self, xdata, ydata, gx, gy, tolerance):
+        """
+        return (line, index, distance) of the sample of the visible lines
+        closest to (xdata, ydata), where the distance is scaled by gx/gy (e.g.,
+        pixels per unit). Only the samples within tolerance in x are checked,
+        or the sample closest to xdata if there is none.
+        """
+        self.update()
+        best = (None, -1, np.inf)
+        for index, group in zip(self.indexes, self.groups):
+            lines = [self.lines[g] for g in group if self.lines[g].get_visible()]
+            if len(index) == 0 or not lines:
+                continue
+            samples = index.between(xdata - tolerance/gx, xdata + tolerance/gx)
+            if len(samples) == 0:
+                samples = np.atleast_1d(index.nearest(xdata))
+            dx = (index.x[samples] - xdata) * gx
+            dx *= dx
+            for line in lines:
+                dy = (np.asarray(line.get_ydata(False))[samples] - ydata) * gy
+                dis = dx + dy*dy
+                i = np.argmin(np.where(np.isnan(dis), np.inf, dis))
+                if dis[i] < best[2]:
+                    best = (line, int(samples[i]), float(dis[i]))
+        line, i, dis = best
+        return line, i, np.sqrt(dis)
+
+    def values(self, xdata):
+        """
+        return the value of each line at xdata, and the line/index of the
+        sample closest to xdata among all lines
+        """
+        idx, closest = self.lookup(xdata)
+        if self.mode == 'nearest':
+            values = [l.get_ydata()[i] if i >= 0 else None for l, i in zip(self.lines, idx)]
+        else:
+            values = [v[0] if v is not None else None for v in self.sample(xdata)]
+        return values, closest
+
+    def get_range_stats(self, line):
+        """return the RangeStats of line, None if its y data is not numeric"""
+        self.update()
+        return self._get_range_stats(line)
+
+    def _get_range_stats(self, line):
+        # the index is up to date
+        index = self.line_index.get(line, None)
+        if index is None:
+            return None
+        y = line.get_ydata(False)
+        stats = self.stats.get(line, None)
+        if stats is None or not stats.is_same(index, y):
+            if np.asarray(y).dtype.kind not in 'biuf':
+                return None
+            stats = RangeStats(index, y)
+            self.stats[line] = stats
+        return stats
+
+    def get_events(self, line, kind, threshold=None):
+        """return the Events of line"""
+        self.update()
+        index = self.line_index.get(line, None)
+        if index is None:
+            return None
+        y = line.get_ydata(False)
+        events = self.events.setdefault(line, {})
+        key = (kind, threshold)
+        e = events.get(key, None)
+        if e is None or not e.is_same(index, y):
+            if e is not None:
+                # the data has been changed, all events are out of date
+                events.clear()
+            e = Events(index, y, kind, threshold)
+            events[key] = e
+        return e
+
+    def find_event(self, line, xdata, kind, threshold=None, step=1):
+        """
+        return the x of the event of line, which is step events away from
+        xdata, None if not found
+        """
+        events = self.get_events(line, kind, threshold)
+        if events is None:
+            return None
+        return events.find(xdata, step)
+
+    def range_stats(self, start, end):
+        """
+        return the statistics of each line in the x range [start, end] (one
+        row for each line)
+        """
+        self.update()
+        labels, rows = [], []
+        for line in self.lines:
+            stats = self._get_range_stats(line)
+            if stats is None:
+                continue
+            labels.append(self.get_label(line))
+            rows.append(stats.get(start, end))
+        columns = ['count', 'mean', 'min', 'max', 'rms', 'integral']
+        return pd.DataFrame(rows, index=labels, columns=columns)
+
+    def get_label(self, line):
+        """return the base label of line"""
+        label = line.get_label()
+        base, shown = self.labels.get(line, (None, None))
+        if base is None or shown != label:
+            # new line, or the label has been changed
+            base = label
+            self.labels[line] = (base, label)
+        return base
+
+    def set_value(self, line, value):
+        """show the value in the line label"""
+        base = self.get_label(line)
+        if value is None:
+            label = base
+        else:
+            label = f'{base} {format_value(value)}'
+        self.labels[line] = (base, label)
+        line.set_label(label)
+
+    def restore_labels(self):
+        """remove the values from the line labels"""
+        for line in self.get_lines():
+            base = self.get_label(line)
+            line.set_label(base)
+        self.labels.clear()
+
+class ImageIndex:
+    """
+    Map a position to the pixel of an AxesImage (with its extent), or to the
+    cell of a QuadMesh on a rectilinear grid (searchsorted on its edges). The
+    data array is never scanned. The sample index is row * columns + column.
+    """
+    def __init__(self, artist):
+        self.artist = weakref.ref(artist)
+        self.array = artist.get_array()
+        self.xedges = self.yedges = None
+        self.uniform = isinstance(artist, AxesImage)
+        if self.uniform:
+            self.extent = tuple(artist.get_extent())
+            left, right, bottom, top = self.extent
+            ny, nx = self.array.shape[:2]
+            self.xedges = np.array([left, right])
+            # row 0 is at the top for origin 'upper'
+            if artist.origin == 'upper':
+                self.yedges = np.array([top, bottom])
+            else:
+                self.yedges = np.array([bottom, top])
+        else:
+            self.coords = artist.get_coordinates()
+            ny, nx = self.coords.shape[0] - 1, self.coords.shape[1] - 1
+            xedges, yedges = self.coords[0, :, 0], self.coords[:, 0, 1]
+            # only rectilinear grid is supported
+            if self.array is not None and np.size(self.array) == nx * ny and \
+               np.array_equal(self.coords[-1, :, 0], xedges) and \
+               np.array_equal(self.coords[:, -1, 1], yedges):
+                self.xedges, self.yedges = xedges, yedges
+        self.shape = (ny, nx)
+
+    def is_valid(self):
+        return self.xedges is not None
+
+    def is_same(self, artist):
+        if self.artist() is not artist or artist.get_array() is not self.array:
+            return False
+        if self.uniform:
+            return tuple(artist.get_extent()) == self.extent
+        return artist.get_coordinates() is self.coords
+
+    @staticmethod
+    def _locate(edges, v, n, uniform):
+        # the cell of v in edges, -1 if it is outside
+        e0, e1 = edges[0], edges[-1]
+        if not np.isfinite(v):
+            return -1
+        if uniform:
+            if e1 == e0:
+                return -1
+            i = int(np.floor((v - e0) / (e1 - e0) * n))
+            # include the last edge
+            if i == n and v == e1:
+                i = n - 1
+        elif e0 <= e1:
+            i = int(np.searchsorted(edges, v, side='right')) - 1
+            if i == n and v == e1:
+                i = n - 1
+        else:
+            i = n - int(np.searchsorted(edges[::-1], v, side='right'))
+            if i == -1 and v == e0:
+                i = 0
+        return i if 0 <= i < n else -1
+
+    def find(self, xdata, ydata):
+        """return the index of the pixel/cell at (xdata, ydata), or -1"""
+        if not self.is_valid():
+            return -1
+        ny, nx = self.shape
+        col = self._locate(self.xedges, xdata, nx, self.uniform)
+        row = self._locate(self.yedges, ydata, ny, self.uniform)
+        if col < 0 or row < 0:
+            return -1
+        return row * nx + col
+
+    def _centers(self, edges, i, n):
+        if self.uniform:
+            return edges[0] + (i + 0.5) * (edges[-1] - edges[0]) / n
+        return (edges[i] + edges[i+1]) / 2
+
+    def sample(self, index):
+        """
+        return the x, y (at the pixel/cell center) and value of the samples at
+        index; for RGB(A) image, the value has one column for each channel
+        """
+        ny, nx = self.shape
+        index = np.asarray(index, dtype=int)
+        row, col = index // nx, index % nx
+        x = self._centers(self.xedges, col, nx)
+        y = self._centers(self.yedges, row, ny)
+        array = self.array
+        if array.ndim == 1 or (not self.uniform and array.shape[:2] != (ny, nx)):
+            array = array.reshape(ny, nx)
+        z = array[row, col]
+        if np.ma.isMaskedArray(z) and z.dtype.kind in 'biuf':
+            z = np.ma.filled(z.astype(float), np.nan)
+        return x, y, np.asarray(z)
+
+    def __len__(self):
+        return self.shape[0] * self.shape[1]
+
+
+_image_indexes = weakref.WeakKeyDictionary()
+
+def is_image(artist):
+    """return True if artist is an image (AxesImage or QuadMesh)"""
+    return isinstance(artist, (AxesImage, QuadMesh))
+
+def get_images(ax):
+    """return the visible images in ax, the top one first"""
+    images = [a for a in ax.images + ax.collections if is_image(a) and a.get_visible()]
+    return sorted(images, key=lambda a: a.get_zorder(), reverse=True)
+
+def get_image_index(artist):
+    """return the ImageIndex of artist, which is rebuilt if its data is changed"""
+    index = _image_indexes.get(artist, None)
+    if index is None or not index.is_same(artist):
+        index = _image_indexes[artist] = ImageIndex(artist)
+    return index
+
+def find_image(ax, xdata, ydata):
+    """return the top image in ax at (xdata, ydata) and the index of the sample"""
+    for image in get_images(ax):
+        idx = get_image_index(image).find(xdata, ydata)
+        if idx != -1:
+            return image, idx
+    return None, -1
+
+
+def export_table(readouts, xdata):
+    """
+    Export the values of all lines in readouts at each position in xdata to a
+    DataFrame (one row for each position). All values are gathered into a
+    preallocated array, and the DataFrame is created once. The 'x' column is
+    the x data (in its original type) of the first line for 'nearest' mode,
+    otherwise the positions.
+    """
+    xdata = np.atleast_1d(np.asarray(xdata, dtype=float))
+    columns, values = [], []
+    x = xdata
+    used = {'x'}
+    for readout in readouts:
+        # sample() updates the lines
+        samples = readout.sample(xdata)
+        for line, v in zip(readout.lines, samples):
+            if v is None:
+                # empty line
+                continue
+            label = readout.get_label(line)
+            name, n = label, 1
+            while name in used:
+                # some line has the same label
+                n += 1
+                name = f'{label}_{n}'
+            if not columns:
+                x = _get_x(line, readout, xdata)
+            used.add(name)
+            columns.append(name)
+            values.append(v)
+
+    dtypes = [v.dtype for v in values]
+    if dtypes and all(d.kind in 'biuf' for d in dtypes):
+        dtype = functools.reduce(np.promote_types, dtypes)
+    else:
+        dtype = object
+    table = np.empty((len(xdata), len(columns)), dtype=dtype)
+    for i, v in enumerate(values):
+        table[:, i] = v
+    df = pd.DataFrame(table, columns=columns)
+    df.insert(0, 'x', x)
+    return df
+
+
+def _get_x(line, readout, xdata):
+    # the x data in the type of the line x data
+    x = np.asarray(line.get_xdata())
+    if readout.mode == 'nearest':
+        return x[readout.index(line, xdata)]
+    if x.dtype.kind == 'M':
+        # matplotlib converts datetime64 to days since epoch
+        return np.datetime64(mdates.get_epoch()) + \
+               (xdata * 86400e6).astype('timedelta64[us]')
+    return xdata
+
+
+def format_value(v):
+    if isinstance(v, (int, float, np.number)):
+        return f'{v:g}'
+    return f'{v}'
@@ -0,0 +1,78 @@
+import weakref
+import wx
+from .graph_readout import format_value
+
+class ReadoutListCtrl(wx.ListCtrl):
+    """
+    Virtual list to show the values of all lines at the timeline. The text is
+    only formatted when a row is shown, so the cost of refreshing does not
+    depend on the number of lines.
+    """
+    columns = (('Line', 160), ('Value', 100), ('Delta', 100), ('Units', 80))
+
+    def __init__(self, parent):
+        super().__init__(parent, style=wx.LC_REPORT | wx.LC_VIRTUAL | wx.LC_HRULES |
+                         wx.LC_VRULES)
+        for i, (name, width) in enumerate(self.columns):
+            self.InsertColumn(i, name, width=width)
+        # (names, values, deltas, units)
+        self.rows = ([], [], [], [])
+        self.SetItemCount(0)
+
+    def OnGetItemText(self, item, column):
+        v = self.rows[column][item]
+        if column in (1, 2):
+            return '' if v is None else format_value(v)
+        return v
+
+    def SetRows(self, rows):
+        n = len(rows[0])
+        changed = n != self.GetItemCount() or \
+                  any(a != b for a, b in zip(rows[0], self.rows[0])) or \
+                  any(a != b for a, b in zip(rows[3], self.rows[3]))
+        self.rows = rows
+        if changed:
+            # lines have been changed, refresh all
+            self.SetItemCount(n)
+            self.Refresh()
+            return
+        if n == 0:
+            return
+        # only refresh the visible rows
+        top = self.GetTopItem()
+        bottom = min(top + self.GetCountPerPage(), n - 1)
+        self.RefreshItems(top, bottom)
+
+class ReadoutPanel(wx.Panel):
+    """
+    Panel to show the values of all lines at the timeline, and their
+    differences to the values at the vertical aux timeline.
+    """
+    def __init__(self, parent, timeline):
+        super().__init__(parent)
+        self.timeline = weakref.ref(timeline)
+
+        self.list = ReadoutListCtrl(self)
+        sizer = wx.BoxSizer(wx.VERTICAL)
+        sizer.Add(self.list, 1, wx.EXPAND)
+        self.SetSizer(sizer)
+
+        self.pending = False
+
+    def request_update(self):
+        """update the values later, multiple requests are merged"""
+        if self.pending:
+            return
+        self.pending = True
+        wx.CallAfter(self.update)
+
+    def update(self):
+        if not self:
+            # the panel has been destroyed
+            return
+        self.pending = False
+        timeline = self.timeline()
+        if timeline is None:
+            self.list.SetRows(([], [], [], []))
+            return
+        self.list.SetRows(timeline.get_readout_rows())
@@ -1,5 +1,81 @@
+import weakref
 import matplotlib
 
+def _get_share_root(ax, axis='x'):
+    # follow the _sharex/_sharey chain to the axes shared by the others
+    name = f'_share{axis}'
+    root = ax
+    while root and getattr(root, name):
+        root = getattr(root, name)
+    return root
+
+def _get_share_signature(figure):
+    # the size of the share group of each axes, to detect the sharing
+    # changed without our helpers (e.g., Axes.sharex)
+    return tuple((len(ax.get_shared_x_axes().get_siblings(ax)),
+                  len(ax.get_shared_y_axes().get_siblings(ax)))
+                 for ax in figure.axes)
+
+class ShareGroups:
+    """
+    Index of the axes sharing x/y-axis in a figure, so the group of an axes
+    can be found without walking the share chain or scanning all axes.
+    """
+    def __init__(self, figure):
+        # the axes when the index is built, to detect the axes added/removed
+        # (e.g., by pyplot) without our helpers
+        self.axes = list(figure.axes)
+        self.signature = _get_share_signature(figure)
+        self.dirty = False
+        self.root = {'x': {}, 'y': {}}
+        # the group of each axes, from the matplotlib Grouper, so the sharing
+        # without the _sharex/_sharey chain (e.g., Grouper.join) is included
+        self.members = {'x': {}, 'y': {}}
+        for axis in ('x', 'y'):
+            for ax in figure.axes:
+                self.root[axis][ax] = _get_share_root(ax, axis)
+                if ax in self.members[axis]:
+                    continue
+                grouper = getattr(ax, f'get_shared_{axis}_axes')()
+                siblings = grouper.get_siblings(ax)
+                group = [a for a in figure.axes if a in siblings]
+                for a in group:
+                    self.members[axis][a] = group
+
+    def get_root(self, ax, axis='x'):
+        """return the axes at the end of the share chain of ax"""
+        root = self.root[axis].get(ax, None)
+        if root is None:
+            # not in the figure
+            root = _get_share_root(ax, axis)
+        return root
+
+    def get_group(self, ax, axis='x'):
+        """return all axes in the figure sharing the axis with ax"""
+        return self.members[axis].get(ax, [ax])
+
+def get_share_groups(figure):
+    """
+    return the ShareGroups of figure, it is rebuilt only after the axes have
+    been added, removed or moved
+    """
+    groups = getattr(figure, '_bsm_share_groups', None)
+    if groups is not None and not groups.dirty and groups.axes == figure.axes \
+       and groups.signature == _get_share_signature(figure):
+        return groups
+    groups = ShareGroups(figure)
+    figure._bsm_share_groups = groups
+    return groups
+
+def invalidate_share_groups(figure):
+    """
+    mark the ShareGroups of figure out of date, e.g., after changing the
+    sharing of an axes with Axes.sharex/sharey
+    """
+    groups = getattr(figure, '_bsm_share_groups', None)
+    if groups is not None:
+        groups.dirty = True
+
 def get_top_gridspec(ax):
     g = ax.get_gridspec()
     while isinstance(g, matplotlib.gridspec.GridSpecFromSubplotSpec):
@@ -27,6 +103,7 @@ def del_subplot(ax):
     # delete the ax
     fig = ax.figure
     ax.figure.delaxes(ax)
+    invalidate_share_groups(fig)
     g2 = None
     if r > 1:
         if isinstance(g, matplotlib.gridspec.GridSpecFromSubplotSpec):
@@ -242,6 +319,7 @@ def add_subplot(ax, vert=True, sharex=None, sharey=None):
         else:
             sharey = None
         ax_new = ax.figure.add_subplot(ax_new_gs, sharex=sharex, sharey=sharey)
+        invalidate_share_groups(ax.figure)
         ax.figure.subplots_adjust()
     return ax_new
 
@@ -273,14 +351,16 @@ def move_axes(ax, target, direction, edge=False):
 
     # add the axes back to the figure
     add_axes(ax, target, direction, edge=edge)
+    invalidate_share_groups(ax.figure)
 
 def get_sharex(axes):
     # get all shared x-axis in axes
     all_sharex = set()
     for ax in axes:
-        sharex = ax
-        while sharex and sharex._sharex:
-            sharex = sharex._sharex
+        if ax.figure is None:
+            sharex = _get_share_root(ax, 'x')
+        else:
+            sharex = get_share_groups(ax.figure).get_root(ax, 'x')
         if ax != sharex:
             all_sharex.add(sharex)
     return all_sharex
@@ -288,13 +368,18 @@ def get_sharex(axes):
 def get_sharey(axes):
     all_sharey = set()
     for ax in axes:
-        sharey = ax
-        while sharey and sharey._sharey:
-            sharey = sharey._sharey
+        if ax.figure is None:
+            sharey = _get_share_root(ax, 'y')
+        else:
+            sharey = get_share_groups(ax.figure).get_root(ax, 'y')
         if ax != sharey:
             all_sharey.add(sharey)
     return all_sharey
 
+# the lines used to build the legend, to check whether the legend needs to be
+# rebuilt
+_legend_lines = weakref.WeakKeyDictionary()
+
 def refresh_legend(axes, **kwargs):
     lines = [l for l in axes.lines if not l.get_label().startswith('_')]
 
@@ -330,4 +415,28 @@ def refresh_legend(axes, **kwargs):
             legend_line.set_picker(5)
             legend_line.set_visible(True)
             legend_line.set_alpha(1.0 if ax_line.get_visible() else 0.2)
+    _legend_lines[l] = [weakref.ref(line) for line in lines]
     return l
+
+def update_legend_text(axes):
+    """
+    Update the text of the legend entries in place (e.g., the values during
+    timeline dragging). The legend is only rebuilt if its lines have been
+    changed.
+    """
+    legend = axes.get_legend()
+    if legend is None:
+        return refresh_legend(axes)
+    lines = [l for l in axes.lines if not l.get_label().startswith('_')]
+    texts = legend.get_texts()
+    legend_lines = _legend_lines.get(legend, None)
+    if legend_lines is None or len(legend_lines) != len(lines) or \
+       len(texts) != len(lines) or \
+       any(ref() is not line for ref, line in zip(legend_lines, lines)):
+        return refresh_legend(axes)
+
+    for text, line in zip(texts, lines):
+        label = line.get_label()
+        if text.get_text() != label:
+            text.set_text(label)
+    return legend
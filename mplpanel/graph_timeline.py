@@ -1,12 +1,17 @@
+import time
 import weakref
 import datetime
 import wx
+import wx.py.dispatcher as dp
 import matplotlib
 from matplotlib.backends.backend_wx import cursors
 import numpy as np
 import pandas as pd
 from .graph_common import GraphObject, is_aux_line
-from .graph_subplot import refresh_legend
+from .graph_subplot import refresh_legend, update_legend_text
+from .graph_readout import Readout, Events, export_table, format_value
+from .graph_readout_panel import ReadoutPanel
+from .graph_datatip import get_line_key, find_line
 from .utility import send_data_to_shell
 
 class AuxLine:
@@ -23,6 +28,10 @@ class AuxLine:
     def create_if_needed(self):
         pass
 
+    def is_created(self):
+        return all(obj is not None and obj() is not None
+                   for obj in [self.line, self.line2, self.line3, self.text])
+
     def hit_test(self, x, y):
         return False
 
@@ -114,11 +123,22 @@ class XAuxLine(AuxLine):
     line3_label = "_bsm_x_axhline"
     text_label = "_bsm_x_text"
 
-    def __init__(self, ax):
+    def __init__(self, ax, readout=None):
         super().__init__(ax)
 
+        # the samples (line, index) the lines are snapped to
         self.line_idx = 0
         self.line2_idx = 0
+        self.line_src = None
+        self.line2_src = None
+
+        # the index to snap the lines to the data
+        self.readout = readout
+        if self.readout is None:
+            self.readout = Readout(ax)
+
+        # show the statistics of the range between the lines
+        self.show_stats = False
 
     def create_if_needed(self):
         ax = self.ax()
@@ -179,39 +199,118 @@ class XAuxLine(AuxLine):
         if not (self.active in [self.line(), self.line2()]):
             return
         xdata = data
-        x, idx = None, None
-        x_min = np.inf
         if xdata is None:
             xdata = self.active.get_xdata(False)[0]
-        for l in self.active.axes.lines:
-            if is_aux_line(l):
+        # the closest data point among all lines
+        line, idx = self.readout.snap(xdata)
+        if line is not None:
+            self.set_sample(self.active, line, idx)
+            self.update_range()
+
+    def set_sample(self, aux, line, idx):
+        """move aux (line or line2) to the sample idx of line"""
+        x = line.get_xdata()
+        aux.set_xdata([x[idx], x[idx]])
+        if aux == self.line():
+            self.line_idx, self.line_src = idx, weakref.ref(line)
+        else:
+            self.line2_idx, self.line2_src = idx, weakref.ref(line)
+
+    def update_range(self):
+        """update the line between the lines and the text of the distance"""
+        if not self.is_created():
+            return
+        start = self.line().get_xdata()[0]
+        end = self.line2().get_xdata()[0]
+        if isinstance(start, datetime.date) and not isinstance(end, datetime.date):
+            end = matplotlib.dates.num2date(end)
+
+        if not isinstance(start, datetime.date) and isinstance(end, datetime.date):
+            start = matplotlib.dates.num2date(start)
+
+        start, end = min(start, end), max(start, end)
+        self.line3().set_xdata([start, end])
+        dis = self.get_distance_as_text(start, end)
+        if self.show_stats:
+            dis = '\n'.join([dis] + self.get_stats_text())
+        self.text().set_text(dis)
+        self.text().set_x(start+ (end-start)/2)
+
+    def get_range(self):
+        # the range (in float) between the lines
+        if self.line is None or self.line() is None or \
+           self.line2 is None or self.line2() is None:
+            return None
+        start = self.line().get_xdata(False)[0]
+        end = self.line2().get_xdata(False)[0]
+        return min(start, end), max(start, end)
+
+    def get_stats(self):
+        """return the statistics of each line between the lines"""
+        rng = self.get_range()
+        if rng is None:
+            return None
+        return self.readout.range_stats(*rng)
+
+    def get_stats_text(self):
+        stats = self.get_stats()
+        if stats is None:
+            return []
+        text = []
+        for label, s in stats.iterrows():
+            if label.startswith('_'):
                 # legend is not visible
                 continue
-            lx = l.get_xdata(False)
-            lidx = np.argmin(np.abs(lx - xdata))
-            if np.abs(lx[lidx] - xdata) < x_min:
-                x_min = np.abs(lx[lidx] - xdata)
-                x = l.get_xdata()
-                idx = lidx
-        if x is not None and idx is not None:
-            self.active.set_xdata([x[idx], x[idx]])
-            if self.active == self.line():
-                self.line_idx = idx
+            text.append(f"{label}: mean={format_value(s['mean'])} "
+                        f"min={format_value(s['min'])} max={format_value(s['max'])} "
+                        f"rms={format_value(s['rms'])} integral={format_value(s['integral'])}")
+        return text
+
+    def set_show_stats(self, show):
+        self.show_stats = show
+        # refresh the text
+        self.update_range()
+
+    def get_state(self):
+        """
+        return the positions of the lines (None if not shown), see set_state;
+        the sample of each line is saved as (line key, index, x)
+        """
+        if not self.is_show or not self.is_created():
+            return None
+        samples = []
+        for aux, src, idx in ((self.line, self.line_src, self.line_idx),
+                              (self.line2, self.line2_src, self.line2_idx)):
+            key = None
+            if src is not None and src() is not None and src().axes is not None:
+                key = get_line_key(src())
+            samples.append((key, int(idx), float(aux().get_xdata(False)[0])))
+        return {'samples': samples, 'line3': float(self.line3().get_ydata()[0])}
+
+    def set_state(self, state):
+        """restore the positions of the lines (see get_state)"""
+        self.show(state is not None)
+        if state is None or not self.is_created():
+            return
+        ax = self.ax()
+        for aux, (key, idx, xdata) in zip((self.line(), self.line2()), state['samples']):
+            line = find_line(ax.figure, key) if key is not None else None
+            if line is not None:
+                x = line.get_xdata(False)
+                if idx >= len(x) or float(x[idx]) != xdata:
+                    # the data is changed
+                    line = None
+            if line is None:
+                # snap to the closest sample among all lines
+                line, idx = self.readout.snap(xdata)
+            if line is not None:
+                self.set_sample(aux, line, idx)
             else:
-                self.line2_idx = idx
-            start = self.line().get_xdata()[0]
-            end = self.line2().get_xdata()[0]
-            if isinstance(start, datetime.date) and not isinstance(end, datetime.date):
-                end = matplotlib.dates.num2date(end)
-
-            if not isinstance(start, datetime.date) and isinstance(end, datetime.date):
-                start = matplotlib.dates.num2date(start)
-
-            start, end = min(start, end), max(start, end)
-            self.line3().set_xdata([start, end])
-            dis = self.get_distance_as_text(start, end)
-            self.text().set_text(dis)
-            self.text().set_x(start+ (end-start)/2)
+                aux.set_xdata([xdata, xdata])
+        y = state['line3']
+        self.line3().set_ydata([y, y])
+        self.text().set_y(y)
+        self.update_range()
 
     def show(self, show=True):
         super().show(show)
@@ -294,13 +393,39 @@ class YAuxLine(AuxLine):
 
         if ydata is not None:
             self.active.set_ydata([ydata, ydata])
-            start = self.line().get_ydata()[0]
-            end = self.line2().get_ydata()[0]
-            start, end = min(start, end), max(start, end)
-            self.line3().set_ydata([start, end])
-            dis = self.get_distance_as_text(start, end)
-            self.text().set_text(dis)
-            self.text().set_y((start+end)/2)
+            self.update_range()
+
+    def update_range(self):
+        """update the line between the lines and the text of the distance"""
+        if not self.is_created():
+            return
+        start = self.line().get_ydata()[0]
+        end = self.line2().get_ydata()[0]
+        start, end = min(start, end), max(start, end)
+        self.line3().set_ydata([start, end])
+        dis = self.get_distance_as_text(start, end)
+        self.text().set_text(dis)
+        self.text().set_y((start+end)/2)
+
+    def get_state(self):
+        """return the positions of the lines (None if not shown), see set_state"""
+        if not self.is_show or not self.is_created():
+            return None
+        return {'y': (float(self.line().get_ydata(False)[0]),
+                      float(self.line2().get_ydata(False)[0])),
+                'line3': float(self.line3().get_xdata()[0])}
+
+    def set_state(self, state):
+        """restore the positions of the lines (see get_state)"""
+        self.show(state is not None)
+        if state is None or not self.is_created():
+            return
+        for aux, y in zip((self.line(), self.line2()), state['y']):
+            aux.set_ydata([y, y])
+        x = state['line3']
+        self.line3().set_xdata([x, x])
+        self.text().set_x(x)
+        self.update_range()
 
     def show(self, show=True):
         super().show(show)
@@ -319,14 +444,17 @@ class AxLine:
     # labels for main timeline
     axvline_label = "_bsm_axvline"
 
-    def __init__(self, ax):
+    def __init__(self, ax, mode='nearest'):
         self.ax = weakref.ref(ax)
 
         # main timeline, shared among all sharex
         self.axvline = None
 
+        # index the data to get the values at the timeline
+        self.readout = Readout(ax, mode)
+
         # x-axis
-        self.x_aux_line = XAuxLine(ax)
+        self.x_aux_line = XAuxLine(ax, self.readout)
         # y-axis
         self.y_aux_line = YAuxLine(ax)
 
@@ -349,39 +477,35 @@ class AxLine:
         # get the data point in line l that is closest to xdata
         if xdata is None:
             xdata = self.axvline().get_xdata(False)[0]
-        lx = l.get_xdata(False)
-        ly = l.get_ydata()
-        idx = np.argmin(np.abs(lx - xdata))
-        return idx, lx[idx], ly[idx]
+        idx = self.readout.index(l, xdata)
+        if idx < 0:
+            return None, None, None
+        return idx, l.get_xdata(False)[idx], l.get_ydata()[idx]
 
-    def update_legend(self, xdata = None):
+    def get_label(self, l):
+        # the label without the value
+        return self.readout.get_label(l)
+
+    def update_legend(self, xdata = None, show_values=True):
         # update x-axis axvline and legend
         if xdata is None:
             xdata = self.axvline().get_xdata(False)[0]
-        x, idx = None, None
-        x_min = np.inf
-        for l in self.ax().lines:
-            label = l.get_label()
-            if is_aux_line(l):
-                # ignore _bsm line
-                continue
-            lidx, lx, ly = self.get_closest_data(l, xdata)
-            if np.abs(lx - xdata) < x_min:
-                x_min = np.abs(lx - xdata)
-                x = l.get_xdata()
-                idx = lidx
-            if label.startswith('_'):
-                # legend is not visible
-                continue
-
-            label = label.split(' ')
-            if len(label) > 1:
-                label = label[:-1]
-            label = ' '.join(label)
-            label = f'{label} {ly:g}'
-            l.set_label(label)
-        if x is not None and idx is not None:
+        if show_values:
+            values, (line, idx) = self.readout.values(xdata)
+            for l, ly in zip(self.readout.lines, values):
+                if self.get_label(l).startswith('_'):
+                    # legend is not visible
+                    continue
+                self.readout.set_value(l, ly)
+        else:
+            _, (line, idx) = self.readout.lookup(xdata)
+        if self.readout.mode == 'nearest' and line is not None:
+            x = line.get_xdata()
             self.axvline().set_xdata([x[idx], x[idx]])
+        else:
+            # the values are at xdata, not at any sample (e.g., not 'nearest'
+            # mode, or the axes only has images)
+            self.axvline().set_xdata([xdata, xdata])
 
     def hit_test(self, x, y):
         # check if (x, y) is close to the axvline in ax
@@ -407,16 +531,7 @@ class AxLine:
         return ret, line, vert
 
     def clear(self):
-        for l in self.ax().lines:
-            label = l.get_label()
-            if label.startswith('_'):
-                # ignore line without label
-                continue
-            label = label.split(' ')
-            if len(label) > 1:
-                label = label[:-1]
-            label = ' '.join(label)
-            l.set_label(label)
+        self.readout.restore_labels()
         if self.axvline() is not None:
             try:
                 self.axvline().remove()
@@ -437,6 +552,32 @@ class Timeline(GraphObject):
     ID_MOVE_TIMELINE_HERE = wx.NewIdRef()
     ID_SHOW_AUX_TIMELINE = wx.NewIdRef()
     ID_SHOW_Y_AUX_TIMELINE = wx.NewIdRef()
+    ID_CAPTURE = wx.NewIdRef()
+    ID_EXPORT_CAPTURED = wx.NewIdRef()
+    ID_PLAY = wx.NewIdRef()
+    ID_PLAY_UNIT_SAMPLE = wx.NewIdRef()
+    ID_PLAY_UNIT_X = wx.NewIdRef()
+    ID_PLAY_RATE = wx.NewIdRef()
+    ID_PLAY_SPEEDS = {s: wx.NewIdRef() for s in (0.25, 0.5, 1, 2, 5, 10, 100)}
+    ID_LINK = wx.NewIdRef()
+    ID_SHOW_RANGE_STATS = wx.NewIdRef()
+    ID_READOUT_PANEL = wx.NewIdRef()
+    ID_LEGEND_VALUES = wx.NewIdRef()
+    ID_EVENT_NEXT = wx.NewIdRef()
+    ID_EVENT_PREV = wx.NewIdRef()
+    ID_EVENT_THRESHOLD = wx.NewIdRef()
+    ID_EVENT_KINDS = {k: wx.NewIdRef() for k in Events.kinds}
+    ID_EVENT_LINES = []
+    ID_EXPORT_RANGE_STATS = wx.NewIdRef()
+    ID_READOUT_MODES = {'nearest': wx.NewIdRef(), 'previous': wx.NewIdRef(),
+                        'linear': wx.NewIdRef()}
+    # frames per second during playback (and propagation to linked figures)
+    play_fps = 30
+    # timelines in each link group
+    link_groups = {}
+    # the latest (source, xdata) and the pending timer of each link group
+    _link_pending = {}
+    _link_timers = {}
     def __init__(self, figure):
         super().__init__(figure)
 
@@ -449,9 +590,223 @@ class Timeline(GraphObject):
 
         self.initialized = False
 
+        # timeline positions captured for each group of sharex axes
+        self.capturing = False
+        self.captured = weakref.WeakKeyDictionary()
+
+        # playback, rate is in samples per frame ('sample'), or data units per
+        # second ('x'; None to sweep the visible range in 10 seconds)
+        self.play_unit = 'sample'
+        self.play_rate = None
+        self.play_speed = 1
+        self.play_ax = None
+        self.play_start = None
+        self.play_timer = None
+
+        # how the values are read at the timeline, see Readout
+        self.readout_mode = 'nearest'
+        # show the values in the legend, and/or in the readout panel
+        self.legend_values = True
+        self.readout_panel = None
+
+        # the event to jump to (e.g., with ctrl+left/right), see Events
+        self.event_kind = 'crossing'
+        self.event_threshold = 0
+        self.event_line = None
+
+        # the name of the link group
+        self.link_group = None
+        # True when the timeline is moved by a linked figure
+        self.syncing = False
+
+    def disconnect(self):
+        self.pause()
+        self.unlink()
+        if self.readout_panel:
+            dp.send('frame.delete_panel', panel=self.readout_panel)
+        self.readout_panel = None
+        super().disconnect()
+
+    def show_readout_panel(self):
+        """show the values of all lines in a separate panel"""
+        if self.readout_panel:
+            dp.send('frame.show_panel', panel=self.readout_panel)
+            return
+        parent = wx.GetTopLevelParent(self.figure.canvas)
+        self.readout_panel = ReadoutPanel(parent, self)
+        dp.send('frame.add_panel',
+                panel=self.readout_panel,
+                title='Timeline readout',
+                direction='right')
+        self.readout_panel.request_update()
+
+    def show_legend_values(self, show=True):
+        """show/hide the values in the legend"""
+        self.legend_values = show
+        axes = []
+        for ax, axline in self.all_axlines.items():
+            if not show:
+                axline.readout.restore_labels()
+            axes.append(ax)
+        if axes:
+            self.update_legend(axes)
+        if not show:
+            for ax in axes:
+                update_legend_text(ax)
+
+    def get_readout_rows(self):
+        """
+        return the names, values, deltas to the vertical aux timeline and
+        units of all lines at the timeline
+        """
+        names, values, deltas, units = [], [], [], []
+        for ax in self.figure.axes:
+            axline = self.get(ax, create=False)
+            if axline is None or axline.axvline is None or axline.axvline() is None:
+                continue
+            xs = [axline.axvline().get_xdata(False)[0]]
+            rng = axline.x_aux_line.get_range() if axline.x_aux_line.is_show else None
+            if rng is not None:
+                # the delta to the first aux line
+                xs.append(axline.x_aux_line.line().get_xdata(False)[0])
+            unit = ax.get_ylabel()
+            readout = axline.readout
+            # the values at all positions of all lines are resolved at once
+            for line, v in zip(readout.lines, readout.sample(xs)):
+                if v is None:
+                    continue
+                names.append(readout.get_label(line))
+                values.append(v[0])
+                if len(v) > 1 and v.dtype.kind in 'biuf':
+                    deltas.append(v[0] - v[1])
+                else:
+                    deltas.append(None)
+                units.append(unit)
+            # the images are read at the horizontal aux line
+            y_aux_line = axline.y_aux_line
+            if not y_aux_line.is_show or y_aux_line.line is None or y_aux_line.line() is None:
+                continue
+            ydata = y_aux_line.line().get_ydata()[0]
+            for i, (image, v) in enumerate(readout.sample_images(xs, ydata)):
+                if v[0] is None:
+                    continue
+                label = image.get_label()
+                names.append(f'{type(image).__name__} {i}' if label.startswith('_') else label)
+                # scalar, or the channels of RGB(A) image
+                values.append(v[0][()])
+                if len(v) > 1 and v[1] is not None and v[0].ndim == 0 and \
+                   v[0].dtype.kind in 'biuf':
+                    deltas.append(v[0] - v[1])
+                else:
+                    deltas.append(None)
+                units.append('')
+        return names, values, deltas, units
+
+    def get_state(self):
+        """
+        return the state (the positions of the timeline and the aux lines in
+        each axes, and the readout settings) to be restored by set_state
+        """
+        all_axes = self.figure.axes
+        axes = []
+        for ax, axline in self.all_axlines.items():
+            if ax not in all_axes or axline.axvline is None or axline.axvline() is None:
+                continue
+            # the position (instead of the sample) of the timeline is saved,
+            # as it may be between the samples (e.g., readout mode 'linear'),
+            # and the values at the position are read again when restored
+            axes.append({'axes': all_axes.index(ax),
+                         'x': float(axline.axvline().get_xdata(False)[0]),
+                         'x_aux': axline.x_aux_line.get_state(),
+                         'y_aux': axline.y_aux_line.get_state(),
+                         'show_stats': axline.x_aux_line.show_stats})
+        return {'readout_mode': self.readout_mode,
+                'legend_values': self.legend_values,
+                'event': (self.event_kind, self.event_threshold),
+                'axes': axes}
+
+    def set_state(self, state):
+        """restore the timeline from state (see get_state), and redraw once"""
+        self.readout_mode = state.get('readout_mode', self.readout_mode)
+        self.legend_values = state.get('legend_values', self.legend_values)
+        self.event_kind, self.event_threshold = state.get('event', (self.event_kind,
+                                                                    self.event_threshold))
+        all_axes = self.figure.axes
+        for s in state.get('axes', []):
+            if s['axes'] >= len(all_axes):
+                continue
+            ax = all_axes[s['axes']]
+            axline = self.get(ax)
+            axline.readout.set_mode(self.readout_mode)
+            self.initialized = True
+            self.update_legend([ax], s['x'])
+            axline.x_aux_line.show_stats = s.get('show_stats', False)
+            axline.x_aux_line.set_state(s.get('x_aux', None))
+            axline.y_aux_line.set_state(s.get('y_aux', None))
+        if self.readout_panel:
+            self.readout_panel.request_update()
+        self.figure.canvas.draw_idle()
+
+    def link(self, group='default'):
+        """move the timeline with the timelines in other figures in group"""
+        self.unlink()
+        self.link_group = group
+        self.link_groups.setdefault(group, weakref.WeakSet()).add(self)
+
+    def unlink(self):
+        """stop moving the timeline with other figures"""
+        group = self.link_groups.get(self.link_group, None)
+        if group is not None:
+            group.discard(self)
+            if not group:
+                self.link_groups.pop(self.link_group, None)
+        self.link_group = None
+
+    def get_linked(self):
+        """return the other timelines in the same link group"""
+        group = self.link_groups.get(self.link_group, ())
+        return [t for t in group if t is not self]
+
+    def _propagate(self, xdata):
+        # only keep the latest position, and update the linked figures at
+        # most once per frame
+        group = self.link_group
+        Timeline._link_pending[group] = (weakref.ref(self), xdata)
+        if group not in Timeline._link_timers:
+            Timeline._link_timers[group] = wx.CallLater(int(1000/self.play_fps),
+                                                        Timeline._flush_link, group)
+
+    @classmethod
+    def _flush_link(cls, group):
+        cls._link_timers.pop(group, None)
+        source, xdata = cls._link_pending.pop(group, (None, None))
+        source = source() if source is not None else None
+        if source is None or source.link_group != group:
+            return
+        for timeline in source.get_linked():
+            timeline.sync(xdata)
+
+    def sync(self, xdata):
+        """move the timeline to xdata by a linked figure"""
+        canvas = self.figure.canvas
+        # the wx canvas may have been destroyed
+        if not canvas or not self.has_any_visible_lines():
+            return
+        self.syncing = True
+        try:
+            self.activated()
+            axes = [ax for ax in self.figure.axes if ax in self.all_axlines]
+            self.update_legend(axes, xdata)
+        finally:
+            self.syncing = False
+        canvas.draw_idle()
+
+    def has_any_visible_lines(self):
+        return any(self.has_visible_lines(ax) for ax in self.figure.axes)
+
     def get(self, ax, create=True):
         if ax not in self.all_axlines and create:
-            self.all_axlines[ax] = AxLine(ax)
+            self.all_axlines[ax] = AxLine(ax, self.readout_mode)
         if ax in self.all_axlines:
             axline = self.all_axlines[ax]
             axline.update()
@@ -476,6 +831,8 @@ class Timeline(GraphObject):
         x, y = event.x, event.y
         ret, axvline, vert = self._is_close_to_axvline(event.inaxes, x, y)
         if ret:
+            # the user takes over the timeline
+            self.pause()
             self.draggable = True
             self.drag_vert = vert
             self.active_axvline = axvline
@@ -494,10 +851,16 @@ class Timeline(GraphObject):
             return False, None, False
         return axvline.hit_test(x, y)
 
-    def OnUpdated(self, figure, axes):
+    def OnUpdated(self, figure, axes, line=None, xdata_changed=True):
         if not super().OnUpdated(figure, axes):
             return
 
+        if line is not None:
+            # the data of line is changed in place, so the cache is not aware
+            for ax in axes:
+                axline = self.all_axlines.get(ax, None)
+                if axline is not None:
+                    axline.readout.data_changed(line, xdata_changed)
         self.update_legend(axes)
 
     def update_legend(self, axes, xdata = None):
@@ -507,8 +870,35 @@ class Timeline(GraphObject):
             axline = self.get(ax, create=False)
             if axline is None:
                 continue
-            axline.update_legend(xdata=xdata)
-            refresh_legend(ax)
+            axline.update_legend(xdata=xdata, show_values=self.legend_values)
+            if self.legend_values:
+                update_legend_text(ax)
+        if self.readout_panel:
+            self.readout_panel.request_update()
+        if self.capturing:
+            self._capture(axes)
+        if xdata is not None and self.link_group is not None and not self.syncing:
+            self._propagate(xdata)
+
+    def start_capture(self):
+        """start to capture the timeline positions, e.g., during a sweep"""
+        self.captured.clear()
+        self.capturing = True
+
+    def stop_capture(self):
+        """stop to capture the timeline positions"""
+        self.capturing = False
+
+    def _capture(self, axes):
+        for ax in axes:
+            axline = self.get(ax, create=False)
+            if axline is None or axline.axvline is None or axline.axvline() is None:
+                continue
+            sharex = self.get_sharex(ax)
+            positions = self.captured.setdefault(sharex, [])
+            x = axline.axvline().get_xdata(False)[0]
+            if not positions or positions[-1] != x:
+                positions.append(x)
 
     def show_x_axline(self, axes, show):
         # update all sharex
@@ -537,6 +927,26 @@ class Timeline(GraphObject):
                 continue
             axline.x_aux_line.update_line12(xdata)
 
+    def show_range_stats(self, axes, show):
+        for ax in axes:
+            axline = self.get(ax, create=False)
+            if axline is None:
+                continue
+            axline.x_aux_line.set_show_stats(show)
+
+    def _export_range_stats(self, axes):
+        data = []
+        for ax in axes:
+            axline = self.get(ax, create=False)
+            if axline is None or not axline.x_aux_line.is_show:
+                continue
+            stats = axline.x_aux_line.get_stats()
+            if stats is not None:
+                data.append(stats)
+        if len(data) == 1:
+            data = data[0]
+        return data
+
     def update_y_axhline(self, axes, ydata = None):
         # update all sharey
         #axes = self.get_axes(axes, sharey=True)
@@ -545,6 +955,9 @@ class Timeline(GraphObject):
             if axline is None:
                 continue
             axline.y_aux_line.update_line12(ydata)
+        if self.readout_panel:
+            # the images are read at the horizontal aux line
+            self.readout_panel.request_update()
 
     def update_x_axhline(self, axes, y):
         for ax in axes:
@@ -593,43 +1006,20 @@ class Timeline(GraphObject):
         self.draggable = False
 
     def _get_next_x_data(self, ax, xdata, step=1):
-
-        xdata_n = xdata
-        dis_m = np.inf
-        for l in ax.lines:
-            if self.is_aux_line(l):
-                continue
-            x = l.get_xdata(False)
-            idx = np.argmin(np.abs(x - xdata))
-            if x[idx] < xdata and step < 0:
-                # move to left, but "current" idx is on xdata's left, count idx
-                # as 1st point
-                idx = min(max(idx + step + 1, 0), len(x)-1)
-            elif x[idx] > xdata and step > 0:
-                idx = min(max(idx + step - 1, 0), len(x)-1)
-            else:
-                idx = min(max(idx + step, 0), len(x)-1)
-
-            # make sure it is in the right direction, and ignore duplicate x values
-            while (x[idx] <= xdata and step > 0) or (x[idx] >= xdata and step < 0):
-                idx_n = min(max(idx + np.sign(step), 0), len(x)-1)
-                if idx == idx_n:
-                    break
-                idx = idx_n
-            dis = x[idx] - xdata
-            if dis_m > abs(dis) and np.sign(dis) == np.sign(step):
-                # only move to x[idx] if it is in the correct direction and
-                # the make dis_m smaller
-                dis_m = abs(dis)
-                xdata_n = x[idx]
-
-        return xdata_n
+        axline = self.get(ax, create=False)
+        if axline is None:
+            return xdata
+        # step on the merged x data of all lines, so duplicate x values are
+        # ignored
+        return axline.readout.next_x(xdata, step)
 
     def key_pressed(self, event):
         """Callback for key presses."""
         if not event.inaxes:
             return
-        if event.key in ['shift+left', 'left', 'shift+right', 'right']:
+        if event.key in ['ctrl+left', 'ctrl+right']:
+            self.jump_to_event(event.inaxes, 1 if event.key == 'ctrl+right' else -1)
+        elif event.key in ['shift+left', 'left', 'shift+right', 'right']:
             axvline = self.active_axvline
             if axvline is None:
                 # no active line, use the main timeline
@@ -663,6 +1053,160 @@ class Timeline(GraphObject):
 
     def deactivated(self):
         self.draggable = False
+        self.pause()
+
+    def set_readout_mode(self, mode):
+        """set the readout mode ('nearest', 'previous' or 'linear')"""
+        if mode not in Readout.modes:
+            raise ValueError(f"unknown readout mode: {mode}")
+        self.readout_mode = mode
+        axes = []
+        for ax, axline in self.all_axlines.items():
+            axline.readout.set_mode(mode)
+            axes.append(ax)
+        if axes:
+            self.update_legend(axes)
+
+    def get_event_line(self, ax):
+        """return the line to search the events in ax"""
+        line = self.event_line() if self.event_line is not None else None
+        if line is not None and line.axes is ax:
+            return line
+        # the first visible line
+        for l in ax.lines:
+            if not self.is_aux_line(l) and l.get_visible():
+                return l
+        return None
+
+    def set_event(self, kind=None, threshold=None, line=None):
+        """set the event to jump to"""
+        if kind is not None:
+            if kind not in Events.kinds:
+                raise ValueError(f"unknown event: {kind}")
+            self.event_kind = kind
+        if threshold is not None:
+            self.event_threshold = threshold
+        if line is not None:
+            self.event_line = weakref.ref(line)
+
+    def jump_to_event(self, ax, step=1, kind=None, threshold=None, line=None):
+        """
+        move the timeline to the event (kind on line), which is step events
+        (>0 to right, <0 to left) away from the timeline; return the x of the
+        event or None if not found
+        """
+        axline = self.get(ax, create=True)
+        if axline is None:
+            return None
+        if kind is None:
+            kind = self.event_kind
+        if threshold is None:
+            threshold = self.event_threshold
+        if line is None:
+            line = self.get_event_line(ax)
+        if line is None:
+            return None
+        xdata = axline.axvline().get_xdata(False)[0]
+        x = axline.readout.find_event(line, xdata, kind, threshold, step)
+        if x is not None:
+            self.update_legend([ax], x)
+        return x
+
+    def is_playing(self):
+        return self.play_start is not None
+
+    def set_play_rate(self, rate=None, unit=None, speed=None):
+        """
+        set the playback rate in samples per frame (unit='sample'), or data
+        units per second (unit='x'); speed is the multiplier of the rate
+        """
+        if unit is not None:
+            if unit not in ('sample', 'x'):
+                raise ValueError(f"unknown playback unit: {unit}")
+            if unit != self.play_unit:
+                # the rate in the other unit is meaningless
+                self.play_rate = None
+            self.play_unit = unit
+        if rate is not None:
+            self.play_rate = rate
+        if speed is not None:
+            self.play_speed = speed
+        if self.is_playing():
+            # restart from the current position with the new rate
+            self.play(self.play_ax())
+
+    def play(self, ax=None):
+        """start to move the timeline in ax (and its sharex axes)"""
+        if ax is None:
+            axes = [a for a in self.figure.axes if a in self.all_axlines]
+            if not axes:
+                return
+            ax = axes[0]
+        axline = self.get(ax, create=True)
+        if axline is None:
+            return
+        merged = axline.readout.get_merged()
+        if len(merged) == 0:
+            return
+        x0 = axline.axvline().get_xdata(False)[0]
+        if x0 >= merged.x[-1]:
+            # at the end, start from the beginning
+            x0 = merged.x[0]
+        rate = self.play_rate
+        if rate is None:
+            if self.play_unit == 'sample':
+                rate = 1
+            else:
+                xlim = ax.get_xlim()
+                rate = abs(xlim[1] - xlim[0]) / 10
+        self.play_ax = weakref.ref(ax)
+        self.play_start = (time.perf_counter(), x0, rate * self.play_speed)
+        if self.play_timer is None:
+            self.play_timer = wx.CallLater(1, self._play_frame)
+
+    def pause(self):
+        """stop the playback"""
+        self.play_start = None
+        if self.play_timer is not None:
+            self.play_timer.Stop()
+            self.play_timer = None
+
+    def _play_frame(self):
+        self.play_timer = None
+        if not self.is_playing():
+            return
+        ax = self.play_ax()
+        axline = self.get(ax, create=False) if ax is not None else None
+        if axline is None:
+            self.pause()
+            return
+        start = time.perf_counter()
+        t0, x0, rate = self.play_start
+        # the position is decided by the elapsed time, so the frames are
+        # dropped (instead of queued) if the drawing is slow
+        elapsed = start - t0
+        merged = axline.readout.get_merged()
+        if len(merged) == 0:
+            self.pause()
+            return
+        if self.play_unit == 'sample':
+            steps = int(elapsed * self.play_fps * rate)
+            x = axline.readout.next_x(x0, steps) if steps > 0 else x0
+            if steps > 0 and x == x0:
+                # the steps are beyond the last sample
+                x = merged.x[-1]
+        else:
+            x = min(x0 + elapsed * rate, merged.x[-1])
+        self.update_legend([ax], x)
+        self.figure.canvas.draw_idle()
+        if x >= merged.x[-1]:
+            # reach the end
+            self.pause()
+            return
+        # the time left in the budget of current frame
+        interval = 1000 / self.play_fps
+        delay = interval - (time.perf_counter() - start) * 1000
+        self.play_timer = wx.CallLater(max(int(delay), 1), self._play_frame)
 
     def _clear_axline(self, axes):
         for ax in axes:
@@ -674,33 +1218,40 @@ class Timeline(GraphObject):
             self.all_axlines.pop(ax, None)
             refresh_legend(ax)
 
-    def _export(self, axes):
-        data = {}
+    def _export(self, axes, xdata=None):
+        """
+        export the values of all lines at the timeline position (or each
+        position in xdata), one DataFrame for each group of sharex axes
+        """
+        groups = {}
         for ax in axes:
             axline = self.get(ax, create=False)
-            if axline is None:
+            if axline is None or axline.axvline is None or axline.axvline() is None:
                 continue
-            for l in ax.lines:
-                label = l.get_label()
-                if self.is_aux_line(l):
-                    continue
-                if not label.startswith('_'):
-                    # visible legend, remove value first
-                    label = label.split(' ')
-                    if len(label) > 1:
-                        label = label[:-1]
-                    label = ' '.join(label)
-                _, lx, ly = axline.get_closest_data(l)
-                sharex = self.get_sharex(ax)
-                if sharex not in data:
-                    data[sharex] = pd.DataFrame()
-                    data[sharex]['x'] = [lx]
-                if label in data[sharex]:
-                    # some line has the same label
-                    tmp = [k for k in data[sharex] if k.startswith(label)]
-                    label = f"{label}_{len(tmp)+1}"
-                data[sharex][label] = [ly]
-        data = list(data.values())
+            groups.setdefault(self.get_sharex(ax), []).append(axline)
+        data = []
+        for axlines in groups.values():
+            xs = xdata
+            if xs is None:
+                xs = axlines[0].axvline().get_xdata(False)[:1]
+            df = export_table([axline.readout for axline in axlines], xs)
+            if df.shape[1] > 1:
+                data.append(df)
+        if len(data) == 1:
+            data = data[0]
+        return data
+
+    def _export_captured(self):
+        data = []
+        for sharex, xs in self.captured.items():
+            if not xs:
+                continue
+            axes = self.get_axes([sharex], sharex=True)
+            df = self._export(axes, np.array(xs))
+            if isinstance(df, list):
+                data += df
+            else:
+                data.append(df)
         if len(data) == 1:
             data = data[0]
         return data
@@ -709,9 +1260,11 @@ class Timeline(GraphObject):
         axline = self.get(axes[0], create=False)
         aux_visible = False
         y_aux_visible = False
+        stats_visible = False
         if axline is not None:
             aux_visible = axline.x_aux_line.is_show
             y_aux_visible = axline.y_aux_line.is_show
+            stats_visible = axline.x_aux_line.show_stats
         cmd = [{'id': self.ID_MOVE_TIMELINE_HERE,
                 'label': 'Move timeline in view',
                 'enable': self.has_visible_lines(axes[0])},
@@ -720,6 +1273,14 @@ class Timeline(GraphObject):
                 'enable': self.has_visible_lines(axes[0]),
                 'type': wx.ITEM_CHECK,
                 'check': aux_visible},
+               {'id': self.ID_SHOW_RANGE_STATS,
+                'label': 'Show statistics between vertical aux timelines',
+                'enable': aux_visible,
+                'type': wx.ITEM_CHECK,
+                'check': stats_visible},
+               {'id': self.ID_EXPORT_RANGE_STATS,
+                'label': 'Export statistics between vertical aux timelines to shell',
+                'enable': aux_visible},
                {'id': self.ID_SHOW_Y_AUX_TIMELINE,
                 'label': 'Hide horizontal aux line' if y_aux_visible else "Show horizontal aux line",
                 'enable': self.has_visible_lines(axes[0]),
@@ -733,6 +1294,44 @@ class Timeline(GraphObject):
                {'id': self.ID_EXPORT_TO_TERM_ALL,
                 'label': 'Export all to shell'},
                {'type': wx.ITEM_SEPARATOR},
+               {'id': self.ID_CAPTURE,
+                'label': 'Capture timeline positions',
+                'type': wx.ITEM_CHECK,
+                'check': self.capturing},
+               {'id': self.ID_EXPORT_CAPTURED,
+                'label': 'Export captured positions to shell',
+                'enable': any(len(xs) > 0 for xs in self.captured.values())},
+               {'type': wx.ITEM_SEPARATOR},
+               {'id': self.ID_PLAY,
+                'label': 'Pause' if self.is_playing() else 'Play',
+                'enable': self.is_playing() or self.has_visible_lines(axes[0])},
+               {'id': self.ID_READOUT_PANEL,
+                'label': 'Show readout panel'},
+               {'id': self.ID_LEGEND_VALUES,
+                'label': 'Show values in legend',
+                'type': wx.ITEM_CHECK,
+                'check': self.legend_values},
+               {'type': wx.ITEM_DROPDOWN,
+                'label': 'Readout',
+                'items': [{'id': id,
+                           'label': label,
+                           'type': wx.ITEM_RADIO,
+                           'check': self.readout_mode == mode}
+                          for (mode, id), label in zip(self.ID_READOUT_MODES.items(),
+                                                       ['Nearest sample',
+                                                        'Previous sample',
+                                                        'Linear interpolation'])]},
+               {'type': wx.ITEM_DROPDOWN,
+                'label': 'Playback speed',
+                'items': self._get_play_menu()},
+               {'type': wx.ITEM_DROPDOWN,
+                'label': 'Jump to event',
+                'items': self._get_event_menu(axes[0])},
+               {'id': self.ID_LINK,
+                'label': 'Link timeline with other figures',
+                'type': wx.ITEM_CHECK,
+                'check': self.link_group is not None},
+               {'type': wx.ITEM_SEPARATOR},
                {'id': self.ID_CLEAR,
                 'label': 'Clear on current subplot'},
                {'id': self.ID_CLEAR_SHAREX,
@@ -742,6 +1341,63 @@ class Timeline(GraphObject):
               ]
         return cmd
 
+    def _get_play_menu(self):
+        items = [{'id': self.ID_PLAY_UNIT_SAMPLE,
+                  'label': 'Samples per frame',
+                  'type': wx.ITEM_RADIO,
+                  'check': self.play_unit == 'sample'},
+                 {'id': self.ID_PLAY_UNIT_X,
+                  'label': 'Data units per second',
+                  'type': wx.ITEM_RADIO,
+                  'check': self.play_unit == 'x'},
+                 {'id': self.ID_PLAY_RATE,
+                  'label': 'Set rate ...'},
+                 {'type': wx.ITEM_SEPARATOR}]
+        for speed, id in self.ID_PLAY_SPEEDS.items():
+            items.append({'id': id,
+                          'label': f'x{speed:g}',
+                          'type': wx.ITEM_RADIO,
+                          'check': self.play_speed == speed})
+        return items
+
+    def _get_event_menu(self, ax):
+        labels = {'crossing': 'Threshold crossing',
+                  'rising': 'Rising crossing',
+                  'falling': 'Falling crossing',
+                  'edge': 'Value change',
+                  'nan': 'NaN gap',
+                  'peak': 'Peak',
+                  'valley': 'Valley'}
+        line = self.get_event_line(ax)
+        axline = self.get(ax, create=False)
+        items = [{'id': self.ID_EVENT_NEXT,
+                  'label': 'Next\tCtrl+Right',
+                  'enable': line is not None},
+                 {'id': self.ID_EVENT_PREV,
+                  'label': 'Previous\tCtrl+Left',
+                  'enable': line is not None},
+                 {'type': wx.ITEM_SEPARATOR}]
+        for kind, id in self.ID_EVENT_KINDS.items():
+            items.append({'id': id,
+                          'label': labels[kind],
+                          'type': wx.ITEM_RADIO,
+                          'check': self.event_kind == kind})
+        items += [{'type': wx.ITEM_SEPARATOR},
+                  {'id': self.ID_EVENT_THRESHOLD,
+                   'label': f'Threshold ({self.event_threshold:g}) ...'}]
+        menu_lines = []
+        lines = [l for l in ax.lines if not self.is_aux_line(l)]
+        for i, l in enumerate(lines):
+            while i >= len(self.ID_EVENT_LINES):
+                self.ID_EVENT_LINES.append(wx.NewIdRef())
+            menu_lines.append({'id': self.ID_EVENT_LINES[i],
+                               'label': axline.get_label(l) if axline else l.get_label(),
+                               'type': wx.ITEM_RADIO,
+                               'check': l is line})
+        if menu_lines:
+            items.append({'type': wx.ITEM_DROPDOWN, 'label': 'Lines', 'items': menu_lines})
+        return items
+
     def ProcessCommand(self, cmd, axes):
         if cmd == self.ID_MOVE_TIMELINE_HERE:
             for ax in axes:
@@ -784,3 +1440,98 @@ class Timeline(GraphObject):
 
             data = self._export(axes)
             send_data_to_shell('timeline_data', data)
+        elif cmd == self.ID_CAPTURE:
+            if self.capturing:
+                self.stop_capture()
+            else:
+                self.start_capture()
+                # the current position is the first one
+                self._capture(self.figure.axes)
+        elif cmd == self.ID_EXPORT_CAPTURED:
+            data = self._export_captured()
+            send_data_to_shell('timeline_data', data)
+        elif cmd == self.ID_PLAY:
+            if self.is_playing():
+                self.pause()
+            else:
+                self.play(axes[0])
+        elif cmd in self.ID_READOUT_MODES.values():
+            for mode, id in self.ID_READOUT_MODES.items():
+                if id == cmd:
+                    self.set_readout_mode(mode)
+        elif cmd == self.ID_SHOW_RANGE_STATS:
+            for ax in axes:
+                axline = self.get(ax, create=False)
+                if axline is None:
+                    continue
+                self.show_range_stats([ax], not axline.x_aux_line.show_stats)
+        elif cmd == self.ID_EXPORT_RANGE_STATS:
+            data = self._export_range_stats(axes)
+            send_data_to_shell('range_stats', data)
+        elif cmd in [self.ID_EVENT_NEXT, self.ID_EVENT_PREV]:
+            self.jump_to_event(axes[0], 1 if cmd == self.ID_EVENT_NEXT else -1)
+        elif cmd in self.ID_EVENT_KINDS.values():
+            for kind, id in self.ID_EVENT_KINDS.items():
+                if id == cmd:
+                    self.set_event(kind=kind)
+        elif cmd == self.ID_EVENT_THRESHOLD:
+            threshold = self.event_threshold
+            axline = self.get(axes[0], create=False)
+            if axline is not None and axline.y_aux_line.is_show:
+                # use the horizontal aux line as the default value
+                threshold = axline.y_aux_line.line().get_ydata()[0]
+            threshold = wx.GetTextFromUser(message='Threshold for the crossing events:',
+                                           caption="bsmedit",
+                                           default_value=f'{threshold:g}')
+            if not threshold:
+                # cancel is clicked
+                return
+            try:
+                self.set_event(threshold=float(threshold))
+            except ValueError:
+                pass
+        elif cmd in self.ID_EVENT_LINES:
+            lines = [l for l in axes[0].lines if not self.is_aux_line(l)]
+            i = self.ID_EVENT_LINES.index(cmd)
+            if i < len(lines):
+                self.set_event(line=lines[i])
+        elif cmd == self.ID_READOUT_PANEL:
+            self.show_readout_panel()
+        elif cmd == self.ID_LEGEND_VALUES:
+            self.show_legend_values(not self.legend_values)
+        elif cmd == self.ID_LINK:
+            if self.link_group is None:
+                self.link()
+            else:
+                self.unlink()
+        elif cmd == self.ID_PLAY_UNIT_SAMPLE:
+            self.set_play_rate(unit='sample')
+        elif cmd == self.ID_PLAY_UNIT_X:
+            self.set_play_rate(unit='x')
+        elif cmd == self.ID_PLAY_RATE:
+            if self.play_unit == 'sample':
+                unit = 'samples per frame'
+            else:
+                unit = 'data units per second'
+            msg = f'Playback rate in {unit} ("auto" for the default):'
+            rate = self.play_rate
+            if rate is None:
+                rate = 'auto'
+            rate = wx.GetTextFromUser(message=msg, caption="bsmedit", default_value=f'{rate}')
+            if not rate:
+                # cancel is clicked
+                return
+
+            try:
+                rate = float(rate)
+            except ValueError:
+                rate = None
+            if rate is not None and rate <= 0:
+                rate = None
+            # the default rate if rate is None
+            self.play_rate = None
+            self.set_play_rate(rate=rate)
+        elif cmd in self.ID_PLAY_SPEEDS.values():
+            for speed, id in self.ID_PLAY_SPEEDS.items():
+                if id == cmd:
+                    self.set_play_rate(speed=speed)
@@ -0,0 +1,23 @@
+import pytest
+for _mod in ('wx', 'aui2', 'propgrid'):
+    pytest.importorskip(_mod)
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from mplpanel.graph_datatip import DataCursor
+
+
+def test_add_peaks_with_image_datatip():
+    fig, ax = plt.subplots()
+    x = np.linspace(0, 10, 1000)
+    line, = ax.plot(x, np.sin(x))
+    image = ax.imshow(np.arange(12.).reshape(3, 4), extent=(0, 10, -1, 1),
+                      aspect='auto')
+    dc = DataCursor(fig, None)
+    dc.set_active(dc.create_annotations(image, [5])[0])
+    # the datatip is on the image, the peaks of the lines are added
+    assert dc.ProcessCommand(DataCursor.ID_ADD_PEAK, [ax])
+    assert any(ant.line is line for ant in dc.annotations)
+    dc.disconnect()
+    plt.close(fig)
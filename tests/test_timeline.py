@@ -0,0 +1,24 @@
+import pytest
+for _mod in ('wx', 'aui2', 'propgrid'):
+    pytest.importorskip(_mod)
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from mplpanel.graph_timeline import AxLine
+
+
+def test_update_legend_image_only():
+    fig, (ax1, ax2) = plt.subplots(2, 1, sharex=True)
+    ax1.plot(np.arange(100), np.arange(100))
+    ax2.imshow(np.arange(100.).reshape(10, 10), extent=(0, 100, 0, 10),
+               aspect='auto')
+    axlines = [AxLine(ax) for ax in (ax1, ax2)]
+    for axline in axlines:
+        axline.update()
+        axline.update_legend(12.3)
+    # snapped to the closest sample of the line
+    assert axlines[0].axvline().get_xdata(False)[0] == 12
+    # no line, the timeline moves to the position
+    assert axlines[1].axvline().get_xdata(False)[0] == 12.3
+    plt.close(fig)